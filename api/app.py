@@ -2,22 +2,47 @@
 
 import logging
 import os
+from functools import lru_cache
 from pathlib import Path
 
-import bcrypt
 import click
 from flask import Flask, jsonify, send_from_directory
 from flask_cors import CORS
 
 from api.config import config
 from api.errors import APIError
+from api.json_provider import ORJSONProvider
+from api.middleware.auth import (
+    get_current_user_id,
+    invalidate_cached_user,
+    login_required,
+)
+from api.routes.admin import bp as admin_bp
+from api.routes.auth import bp as auth_bp
+from api.routes.auto_teach import bp as auto_teach_bp
+from api.routes.billing import bp as billing_bp
+from api.routes.documents import bp as documents_bp
+from api.routes.exam import bp as exam_bp
+from api.routes.knowledge import bp as knowledge_bp
+from api.routes.profile import bp as profile_bp
+from api.routes.progress import bp as progress_bp
+from api.routes.review import bp as review_bp
+from api.routes.rewards import bp as rewards_bp
+from api.routes.tutor import bp as tutor_bp
+from api.services.achievement_definitions import seed_achievements
+from api.services.password import hash_password
 from api.services.rate_limiter import limiter
+from api.services.subject_taxonomy import seed_subject_taxonomy
 
 logger = logging.getLogger(__name__)
 
+_IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
 
-def _hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+_ALLOWED_ORIGINS: tuple[str, ...] = (
+    "http://localhost:5173",
+    "http://127.0.0.1:5173",
+    *(o.strip() for o in os.getenv("ALLOWED_ORIGINS", "").split(",") if o.strip()),
+)
 
 
 def _seed_initial_admin() -> None:
@@ -56,7 +81,7 @@ def _seed_initial_admin() -> None:
             db.add(
                 User(
                     email=admin_email,
-                    password_hash=_hash_password(admin_password),
+                    password_hash=hash_password(admin_password),
                     display_name="Admin",
                     tier="pro",
                     subscription_status="active",
@@ -72,6 +97,33 @@ def _seed_initial_admin() -> None:
         )
 
 
+def _handle_api_error(error: APIError):
+    return jsonify({"error": error.message}), error.status_code
+
+
+def _handle_500(_err):
+    logger.exception("Unhandled exception")
+    return jsonify({"error": "Internal server error"}), 500
+
+
+def _health():
+    return jsonify(
+        {
+            "status": "ok",
+            "app": "LawFlow",
+        }
+    )
+
+
+@login_required
+def _seed():
+    """Seed database on demand (subjects/topics); safe to call multiple times."""
+    user_id = get_current_user_id()
+    seed_subject_taxonomy(user_id=user_id)
+    seed_achievements(user_id=user_id)
+    return jsonify({"status": "ok", "message": "Subject and topic taxonomy seeded."})
+
+
 def create_app(static_dir: str | None = None) -> Flask:
     config.validate()
 
@@ -81,11 +133,10 @@ def create_app(static_dir: str | None = None) -> Flask:
         if candidate.exists():
             resolved_static_dir = str(candidate)
 
-    app = Flask(
-        __name__,
-        static_folder=resolved_static_dir,
-        static_url_path="" if resolved_static_dir else None,
-    )
+    # The SPA is served by serve_frontend below; Flask's own static route
+    # would shadow it at static_url_path="" and break client-side routes.
+    app = Flask(__name__, static_folder=None)
+    app.json = ORJSONProvider(app)
     app.config["SECRET_KEY"] = config.SECRET_KEY
     app.config["MAX_CONTENT_LENGTH"] = config.MAX_UPLOAD_MB * 1024 * 1024
 
@@ -95,62 +146,17 @@ def create_app(static_dir: str | None = None) -> Flask:
             "Add your key to the .env file."
         )
 
-    allowed_origins = ["http://localhost:5173", "http://127.0.0.1:5173"]
-    extra_origins = os.getenv("ALLOWED_ORIGINS", "")
-    if extra_origins:
-        allowed_origins.extend(o.strip() for o in extra_origins.split(",") if o.strip())
-
-    CORS(app, origins=allowed_origins,
+    CORS(app, origins=_ALLOWED_ORIGINS,
          expose_headers=["X-Session-Id", "X-Tutor-Mode", "X-Topic"])
     limiter.init_app(app)
 
-    from api.middleware.auth import get_current_user_id, login_required
-
-    # Error handler
-    @app.errorhandler(APIError)
-    def handle_api_error(error):
-        return jsonify({"error": error.message}), error.status_code
-
-    @app.errorhandler(500)
-    def handle_500(_err):
-        logger.exception("Unhandled exception")
-        return jsonify({"error": "Internal server error"}), 500
-
-    # Health check
-    @app.route("/api/health")
-    def health():
-        return jsonify(
-            {
-                "status": "ok",
-                "app": "LawFlow",
-            }
-        )
+    app.register_error_handler(APIError, _handle_api_error)
+    app.register_error_handler(500, _handle_500)
 
-    # Seed database on demand (subjects/topics); safe to call multiple times
-    @app.route("/api/seed", methods=["POST"])
-    @login_required
-    def seed():
-        from api.services.subject_taxonomy import seed_subject_taxonomy
-        from api.services.achievement_definitions import seed_achievements
-        user_id = get_current_user_id()
-        seed_subject_taxonomy(user_id=user_id)
-        seed_achievements(user_id=user_id)
-        return jsonify({"status": "ok", "message": "Subject and topic taxonomy seeded."})
+    app.add_url_rule("/api/health", "health", _health)
+    app.add_url_rule("/api/seed", "seed", _seed, methods=["POST"])
 
     # Register blueprints
-    from api.routes.documents import bp as documents_bp
-    from api.routes.auth import bp as auth_bp
-    from api.routes.billing import bp as billing_bp
-    from api.routes.tutor import bp as tutor_bp
-    from api.routes.progress import bp as progress_bp
-    from api.routes.knowledge import bp as knowledge_bp
-    from api.routes.auto_teach import bp as auto_teach_bp
-    from api.routes.review import bp as review_bp
-    from api.routes.exam import bp as exam_bp
-    from api.routes.profile import bp as profile_bp
-    from api.routes.rewards import bp as rewards_bp
-    from api.routes.admin import bp as admin_bp
-
     app.register_blueprint(auth_bp)
     app.register_blueprint(billing_bp)
     app.register_blueprint(documents_bp)
@@ -167,7 +173,13 @@ def create_app(static_dir: str | None = None) -> Flask:
     @app.cli.command("rotate-admin-password")
     @click.option("--email", required=True, help="Admin email address")
     @click.password_option("--password", confirmation_prompt=True)
-    def rotate_admin_password(email: str, password: str) -> None:
+    @click.option(
+        "--cost",
+        type=click.IntRange(4, 31),
+        default=None,
+        help="bcrypt cost factor (defaults to BCRYPT_ROUNDS)",
+    )
+    def rotate_admin_password(email: str, password: str, cost: int | None) -> None:
         from api.models.user import User
         from api.services.database import get_db
 
@@ -176,20 +188,36 @@ def create_app(static_dir: str | None = None) -> Flask:
             user = db.query(User).filter_by(email=target_email).first()
             if not user or not bool(user.is_admin):
                 raise click.ClickException("Admin user not found")
-            user.password_hash = _hash_password(password)
+            user.password_hash = hash_password(password, rounds=cost)
+            invalidate_cached_user(user.id)
         click.echo(f"Updated password for admin {target_email}")
 
     if resolved_static_dir:
+        # Build output is fixed for the life of the process, so stat() each
+        # path at most once.
+        static_root = Path(resolved_static_dir)
+
+        @lru_cache(maxsize=2048)
+        def _is_static_file(path: str) -> bool:
+            candidate = static_root / path
+            return candidate.is_file() and static_root in candidate.resolve().parents
+
         @app.route("/", defaults={"path": ""})
         @app.route("/<path:path>")
         def serve_frontend(path: str):
             if path.startswith("api/"):
                 return jsonify({"error": "Not found"}), 404
 
-            file_path = Path(resolved_static_dir) / path
-            if path and file_path.is_file():
-                return send_from_directory(resolved_static_dir, path)
-            return send_from_directory(resolved_static_dir, "index.html")
+            if path and _is_static_file(path):
+                response = send_from_directory(static_root, path)
+                # Vite emits content-hashed files under assets/.
+                response.headers["Cache-Control"] = (
+                    _IMMUTABLE_CACHE_CONTROL if path.startswith("assets/") else "no-cache"
+                )
+                return response
+            response = send_from_directory(static_root, "index.html")
+            response.headers["Cache-Control"] = "no-cache"
+            return response
 
     # Initialize database tables.
     with app.app_context():
@@ -197,6 +225,10 @@ def create_app(static_dir: str | None = None) -> Flask:
         init_database()
         _seed_initial_admin()
 
+    if config.DOCUMENT_JOBS_AUTOSTART:
+        from api.services import document_jobs
+        document_jobs.start()
+
     return app
 
 
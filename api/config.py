@@ -1,8 +1,11 @@
 """LawFlow application configuration."""
 
+import logging
 import os
-from pathlib import Path
+import secrets
+from collections.abc import Mapping
 from dataclasses import dataclass, field
+from pathlib import Path
 from dotenv import load_dotenv
 
 _override_env_path = os.getenv("LAWFLOW_ENV_PATH")
@@ -12,73 +15,132 @@ else:
     _env_path = Path(__file__).resolve().parent.parent / ".env"
 load_dotenv(dotenv_path=_env_path, override=True)
 
+_DEV_SECRET = "dev-secret-change-me"
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class Config:
     # Flask
-    SECRET_KEY: str = field(default_factory=lambda: os.getenv("FLASK_SECRET_KEY", "dev-secret-change-me"))
-    DEBUG: bool = field(default_factory=lambda: os.getenv("FLASK_DEBUG", "false").lower() == "true")
-    HOST: str = field(default_factory=lambda: os.getenv("FLASK_HOST", "127.0.0.1"))
-    PORT: int = field(default_factory=lambda: int(os.getenv("FLASK_PORT", "5002")))
+    SECRET_KEY: str
+    DEBUG: bool
+    HOST: str
+    PORT: int
 
     # Anthropic
-    ANTHROPIC_API_KEY: str = field(default_factory=lambda: os.getenv("ANTHROPIC_API_KEY", ""))
-    CLAUDE_MODEL: str = field(default_factory=lambda: os.getenv("CLAUDE_MODEL", "claude-sonnet-4-20250514"))
+    ANTHROPIC_API_KEY: str
+    CLAUDE_MODEL: str
 
     # Auth / JWT
-    JWT_SECRET_KEY: str = field(default_factory=lambda: os.getenv("JWT_SECRET_KEY", os.getenv("FLASK_SECRET_KEY", "dev-secret-change-me")))
-    JWT_ACCESS_EXPIRES_MINUTES: int = field(default_factory=lambda: int(os.getenv("JWT_ACCESS_EXPIRES_MINUTES", "60")))
-    JWT_REFRESH_EXPIRES_DAYS: int = field(default_factory=lambda: int(os.getenv("JWT_REFRESH_EXPIRES_DAYS", "30")))
+    JWT_SECRET_KEY: str
+    JWT_ACCESS_EXPIRES_MINUTES: int
+    JWT_REFRESH_EXPIRES_DAYS: int
+    BCRYPT_ROUNDS: int  # 4-31; lower only for dev
 
     # Billing
-    STRIPE_SECRET_KEY: str = field(default_factory=lambda: os.getenv("STRIPE_SECRET_KEY", ""))
-    STRIPE_PUBLISHABLE_KEY: str = field(default_factory=lambda: os.getenv("STRIPE_PUBLISHABLE_KEY", ""))
-    STRIPE_WEBHOOK_SECRET: str = field(default_factory=lambda: os.getenv("STRIPE_WEBHOOK_SECRET", ""))
-    STRIPE_PRO_PRICE_ID: str = field(default_factory=lambda: os.getenv("STRIPE_PRO_PRICE_ID", ""))
-    APP_BASE_URL: str = field(default_factory=lambda: os.getenv("APP_BASE_URL", "http://localhost:5173"))
+    STRIPE_SECRET_KEY: str
+    STRIPE_PUBLISHABLE_KEY: str
+    STRIPE_WEBHOOK_SECRET: str
+    STRIPE_PRO_PRICE_ID: str
+    APP_BASE_URL: str
 
     # Email / account lifecycle
-    RESEND_API_KEY: str = field(default_factory=lambda: os.getenv("RESEND_API_KEY", ""))
-    FROM_EMAIL: str = field(default_factory=lambda: os.getenv("FROM_EMAIL", "noreply@yourdomain.com"))
-    EMAIL_TOKEN_TTL_MINUTES: int = field(default_factory=lambda: int(os.getenv("EMAIL_TOKEN_TTL_MINUTES", "60")))
+    RESEND_API_KEY: str
+    FROM_EMAIL: str
+    EMAIL_TOKEN_TTL_MINUTES: int
 
     # Security / limiting
-    LIMITER_STORAGE_URI: str = field(default_factory=lambda: os.getenv("LIMITER_STORAGE_URI", ""))
-    ADMIN_EMAIL: str = field(default_factory=lambda: os.getenv("ADMIN_EMAIL", ""))
-    ADMIN_PASSWORD: str = field(default_factory=lambda: os.getenv("ADMIN_PASSWORD", ""))
+    LIMITER_STORAGE_URI: str
+    ADMIN_EMAIL: str
+    ADMIN_PASSWORD: str
 
     # Storage
-    UPLOAD_DIR: str = field(default_factory=lambda: os.getenv("UPLOAD_DIR", "data/uploads"))
-    PROCESSED_DIR: str = field(default_factory=lambda: os.getenv("PROCESSED_DIR", "data/processed"))
-    DATABASE_URL: str = field(default_factory=lambda: os.getenv("DATABASE_URL", "sqlite:///data/lawflow.db"))
-    MAX_UPLOAD_MB: int = field(default_factory=lambda: int(os.getenv("MAX_UPLOAD_MB", "100")))
-
-    def validate(self) -> None:
-        """Validate production-critical configuration.
-
-        Generates random secrets when defaults are detected so the app can
-        always start, but logs a loud warning so operators know to set them.
+    UPLOAD_DIR: str
+    PROCESSED_DIR: str
+    DATABASE_URL: str
+    MAX_UPLOAD_MB: int
+    # Internal nginx location that maps to the avatar directory. When set,
+    # avatars are handed to nginx via X-Accel-Redirect instead of being
+    # streamed through a Python worker.
+    AVATAR_ACCEL_REDIRECT_PREFIX: str
+    # Background threads per process that extract and tag uploaded
+    # documents; bounds concurrent Claude tagging calls.
+    DOCUMENT_WORKERS: int
+    # Whether create_app() starts those threads; api/gunicorn.conf.py turns
+    # this off and starts them in each worker instead.
+    DOCUMENT_JOBS_AUTOSTART: bool
+
+    # Names of secrets that were randomly generated because the default
+    # placeholder was in use; reported by validate().
+    _generated_secrets: tuple[str, ...] = field(default=(), repr=False)
+
+    @classmethod
+    def from_env(cls, env: Mapping[str, str] = os.environ) -> "Config":
+        """Build the configuration from a single snapshot of ``env``.
+
+        Outside debug mode, placeholder secrets are replaced with random
+        ones so the app can always start; validate() logs a loud warning
+        about each so operators know to set them.
         """
-        import logging
-        import secrets as _secrets
+        env = dict(env)
+        debug = env.get("FLASK_DEBUG", "false").lower() == "true"
+        secret_key = env.get("FLASK_SECRET_KEY", _DEV_SECRET)
+        jwt_secret_key = env.get("JWT_SECRET_KEY", secret_key)
+
+        generated: list[str] = []
+        if not debug:
+            if secret_key == _DEV_SECRET:
+                secret_key = secrets.token_hex(32)
+                generated.append("FLASK_SECRET_KEY")
+            if jwt_secret_key == _DEV_SECRET:
+                jwt_secret_key = secrets.token_hex(32)
+                generated.append("JWT_SECRET_KEY")
+
+        return cls(
+            SECRET_KEY=secret_key,
+            DEBUG=debug,
+            HOST=env.get("FLASK_HOST", "127.0.0.1"),
+            PORT=int(env.get("FLASK_PORT", "5002")),
+            ANTHROPIC_API_KEY=env.get("ANTHROPIC_API_KEY", ""),
+            CLAUDE_MODEL=env.get("CLAUDE_MODEL", "claude-sonnet-4-20250514"),
+            JWT_SECRET_KEY=jwt_secret_key,
+            JWT_ACCESS_EXPIRES_MINUTES=int(env.get("JWT_ACCESS_EXPIRES_MINUTES", "60")),
+            JWT_REFRESH_EXPIRES_DAYS=int(env.get("JWT_REFRESH_EXPIRES_DAYS", "30")),
+            BCRYPT_ROUNDS=int(env.get("BCRYPT_ROUNDS", "12")),
+            STRIPE_SECRET_KEY=env.get("STRIPE_SECRET_KEY", ""),
+            STRIPE_PUBLISHABLE_KEY=env.get("STRIPE_PUBLISHABLE_KEY", ""),
+            STRIPE_WEBHOOK_SECRET=env.get("STRIPE_WEBHOOK_SECRET", ""),
+            STRIPE_PRO_PRICE_ID=env.get("STRIPE_PRO_PRICE_ID", ""),
+            APP_BASE_URL=env.get("APP_BASE_URL", "http://localhost:5173"),
+            RESEND_API_KEY=env.get("RESEND_API_KEY", ""),
+            FROM_EMAIL=env.get("FROM_EMAIL", "noreply@yourdomain.com"),
+            EMAIL_TOKEN_TTL_MINUTES=int(env.get("EMAIL_TOKEN_TTL_MINUTES", "60")),
+            LIMITER_STORAGE_URI=env.get("LIMITER_STORAGE_URI", ""),
+            ADMIN_EMAIL=env.get("ADMIN_EMAIL", ""),
+            ADMIN_PASSWORD=env.get("ADMIN_PASSWORD", ""),
+            UPLOAD_DIR=env.get("UPLOAD_DIR", "data/uploads"),
+            PROCESSED_DIR=env.get("PROCESSED_DIR", "data/processed"),
+            DATABASE_URL=env.get("DATABASE_URL", "sqlite:///data/lawflow.db"),
+            MAX_UPLOAD_MB=int(env.get("MAX_UPLOAD_MB", "100")),
+            AVATAR_ACCEL_REDIRECT_PREFIX=env.get("AVATAR_ACCEL_REDIRECT_PREFIX", ""),
+            DOCUMENT_WORKERS=max(1, int(env.get("DOCUMENT_WORKERS", "2"))),
+            DOCUMENT_JOBS_AUTOSTART=env.get("DOCUMENT_JOBS_AUTOSTART", "true").lower() == "true",
+            _generated_secrets=tuple(generated),
+        )
 
+    def validate(self) -> None:
+        """Warn about production-critical configuration left at defaults."""
         _log = logging.getLogger("api.config")
 
-        if self.DEBUG:
-            return
-
-        if self.SECRET_KEY == "dev-secret-change-me":
-            self.SECRET_KEY = _secrets.token_hex(32)
+        if "FLASK_SECRET_KEY" in self._generated_secrets:
             _log.warning(
                 "FLASK_SECRET_KEY is not set -- generated a random key. "
                 "Sessions will not survive restarts. Set FLASK_SECRET_KEY in your environment."
             )
-        if self.JWT_SECRET_KEY == "dev-secret-change-me":
-            self.JWT_SECRET_KEY = _secrets.token_hex(32)
+        if "JWT_SECRET_KEY" in self._generated_secrets:
             _log.warning(
                 "JWT_SECRET_KEY is not set -- generated a random key. "
                 "Auth tokens will not survive restarts. Set JWT_SECRET_KEY in your environment."
             )
 
 
-config = Config()
+config = Config.from_env()
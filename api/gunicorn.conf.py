@@ -0,0 +1,14 @@
+"""Gunicorn hooks for the LawFlow API, passed with --config."""
+
+import os
+
+# With --preload, create_app() runs once in the master, whose threads the
+# forked workers don't inherit; each worker starts its own document pool
+# once the app is loaded instead.
+os.environ["DOCUMENT_JOBS_AUTOSTART"] = "false"
+
+
+def post_worker_init(worker):
+    from api.services import document_jobs
+
+    document_jobs.start()
@@ -0,0 +1,45 @@
+"""orjson-backed JSON provider for Flask."""
+
+import typing as t
+
+import orjson
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Drop-in replacement for Flask's provider that serialises with orjson.
+
+    Keeps Flask's defaults (sorted keys, indented output in debug mode) and
+    falls back to ``DefaultJSONProvider.default`` for types orjson does not
+    handle natively (e.g. ``Decimal``).
+    """
+
+    def _options(self, *, sort_keys: bool, indent: bool) -> int:
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj: t.Any, **kwargs: t.Any) -> str:
+        option = self._options(
+            sort_keys=kwargs.get("sort_keys", self.sort_keys),
+            indent=bool(kwargs.get("indent")),
+        )
+        return orjson.dumps(obj, default=self.default, option=option).decode("utf-8")
+
+    def loads(self, s: str | bytes, **kwargs: t.Any) -> t.Any:
+        return orjson.loads(s)
+
+    def response(self, *args: t.Any, **kwargs: t.Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        option = self._options(sort_keys=self.sort_keys, indent=indent)
+        body = orjson.dumps(
+            obj,
+            default=self.default,
+            option=option | orjson.OPT_APPEND_NEWLINE,
+        )
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -1,9 +1,17 @@
 """JWT authentication middleware and helpers."""
 
-from datetime import datetime, timedelta, timezone
-from functools import wraps
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import timedelta
+from functools import lru_cache, wraps
 
-import jwt
 from flask import g, has_request_context, request
 
 from api.config import config
@@ -12,43 +20,174 @@ from api.models.user import User
 from api.services.database import get_db
 
 
-def _utcnow() -> datetime:
-    return datetime.now(timezone.utc)
+# Canonical HS256 header, byte-identical to what PyJWT emits, so tokens
+# issued before the hand-rolled codec still take the fast path.
+_JWT_HEADER_B64 = base64.urlsafe_b64encode(b'{"alg":"HS256","typ":"JWT"}').rstrip(b"=")
+
+_ACCESS_EXPIRES_SECONDS = int(timedelta(minutes=config.JWT_ACCESS_EXPIRES_MINUTES).total_seconds())
+_REFRESH_EXPIRES_SECONDS = int(timedelta(days=config.JWT_REFRESH_EXPIRES_DAYS).total_seconds())
+
+_USER_CACHE_TTL_SECONDS = 30
+_USER_CACHE_MAXSIZE = 10_000
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """Auth-relevant user fields, safe to share across requests and threads."""
+
+    id: str
+    is_active: bool
+    is_admin: bool
+
+
+_user_cache: "OrderedDict[str, tuple[float, CachedUser]]" = OrderedDict()
+_user_cache_lock = threading.Lock()
+
+
+def _get_cached_user(user_id: str) -> CachedUser | None:
+    now = time.monotonic()
+    with _user_cache_lock:
+        entry = _user_cache.get(user_id)
+        if entry is None:
+            return None
+        expires_at, cached = entry
+        if expires_at <= now:
+            del _user_cache[user_id]
+            return None
+        _user_cache.move_to_end(user_id)
+        return cached
+
+
+def _cache_user(user: User) -> CachedUser:
+    cached = CachedUser(
+        id=user.id,
+        is_active=user.is_active is not False,
+        is_admin=bool(user.is_admin),
+    )
+    with _user_cache_lock:
+        _user_cache[user.id] = (time.monotonic() + _USER_CACHE_TTL_SECONDS, cached)
+        _user_cache.move_to_end(user.id)
+        while len(_user_cache) > _USER_CACHE_MAXSIZE:
+            _user_cache.popitem(last=False)
+    return cached
+
+
+def invalidate_cached_user(user_id: str) -> None:
+    """Drop a user from the auth cache after changing active/admin state.
+
+    Only affects this process; other workers pick up the change once their
+    entry expires (at most _USER_CACHE_TTL_SECONDS).
+    """
+    with _user_cache_lock:
+        _user_cache.pop(user_id, None)
 
 
 def _extract_bearer_token() -> str:
     auth_header = request.headers.get("Authorization", "")
-    if not auth_header.startswith("Bearer "):
+    if len(auth_header) < 8 or not auth_header.startswith("Bearer "):
         raise UnauthorizedError("Missing Bearer token")
-    token = auth_header.split(" ", 1)[1].strip()
+    token = auth_header[7:].strip()
     if not token:
         raise UnauthorizedError("Missing Bearer token")
+    g._bearer_token = token
     return token
 
 
-def create_token(user_id: str, token_type: str = "access") -> str:
-    if token_type == "refresh":
-        exp = _utcnow() + timedelta(days=config.JWT_REFRESH_EXPIRES_DAYS)
-    else:
-        exp = _utcnow() + timedelta(minutes=config.JWT_ACCESS_EXPIRES_MINUTES)
+def _b64url_encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64url_decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+@lru_cache(maxsize=4)
+def _hmac_for_key(secret: str) -> "hmac.HMAC":
+    """Keyed HMAC-SHA256 state; callers .copy() it instead of re-keying."""
+    return hmac.new(secret.encode("utf-8"), digestmod=hashlib.sha256)
+
+
+def _sign(signing_input: bytes) -> bytes:
+    mac = _hmac_for_key(config.JWT_SECRET_KEY).copy()
+    mac.update(signing_input)
+    return mac.digest()
+
 
+def create_token(user_id: str, token_type: str = "access") -> str:
+    now = int(time.time())
+    lifetime = _REFRESH_EXPIRES_SECONDS if token_type == "refresh" else _ACCESS_EXPIRES_SECONDS
     payload = {
         "sub": user_id,
         "type": token_type,
-        "iat": int(_utcnow().timestamp()),
-        "exp": int(exp.timestamp()),
+        "iat": now,
+        "exp": now + lifetime,
     }
-    return jwt.encode(payload, config.JWT_SECRET_KEY, algorithm="HS256")
+    payload_b64 = _b64url_encode(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+    signing_input = _JWT_HEADER_B64 + b"." + payload_b64
+    return (signing_input + b"." + _b64url_encode(_sign(signing_input))).decode("ascii")
 
 
-def decode_token(token: str, expected_type: str = "access") -> dict:
+def _decode_hs256(token: str) -> dict:
+    """Verify and decode a token carrying the canonical HS256 header.
+
+    Tokens with any other header (e.g. an added ``kid``) fall back to PyJWT.
+    """
+    try:
+        raw = token.encode("ascii")
+    except UnicodeEncodeError as exc:
+        raise UnauthorizedError("Invalid token") from exc
+    parts = raw.split(b".")
+    if len(parts) != 3:
+        raise UnauthorizedError("Invalid token")
+    header_b64, payload_b64, signature_b64 = parts
+    if header_b64 != _JWT_HEADER_B64:
+        return _decode_with_pyjwt(token)
+
     try:
-        payload = jwt.decode(token, config.JWT_SECRET_KEY, algorithms=["HS256"])
+        signature = _b64url_decode(signature_b64)
+    except (binascii.Error, ValueError) as exc:
+        raise UnauthorizedError("Invalid token") from exc
+    if not hmac.compare_digest(signature, _sign(header_b64 + b"." + payload_b64)):
+        raise UnauthorizedError("Invalid token")
+
+    try:
+        payload = json.loads(_b64url_decode(payload_b64))
+    except (binascii.Error, ValueError) as exc:
+        raise UnauthorizedError("Invalid token") from exc
+    if not isinstance(payload, dict):
+        raise UnauthorizedError("Invalid token")
+
+    exp = payload.get("exp")
+    if exp is not None:
+        if not isinstance(exp, (int, float)) or isinstance(exp, bool):
+            raise UnauthorizedError("Invalid token")
+        if exp <= time.time():
+            raise UnauthorizedError("Token has expired")
+    return payload
+
+
+def _decode_with_pyjwt(token: str) -> dict:
+    import jwt
+
+    try:
+        return jwt.decode(token, config.JWT_SECRET_KEY, algorithms=["HS256"])
     except jwt.ExpiredSignatureError as exc:
         raise UnauthorizedError("Token has expired") from exc
     except jwt.InvalidTokenError as exc:
         raise UnauthorizedError("Invalid token") from exc
 
+
+def decode_token(token: str, expected_type: str = "access") -> dict:
+    # Memoise per request so stacked auth decorators verify the HMAC once.
+    cache: dict | None = None
+    if has_request_context():
+        cache = g.setdefault("_decoded_payloads", {})
+    payload = cache.get(token) if cache is not None else None
+    if payload is None:
+        payload = _decode_hs256(token)
+        if cache is not None:
+            cache[token] = payload
+
     token_type = payload.get("type")
     if expected_type and token_type != expected_type:
         raise UnauthorizedError("Invalid token type")
@@ -60,16 +199,31 @@ def issue_auth_tokens(user_id: str) -> dict:
         "access_token": create_token(user_id, "access"),
         "refresh_token": create_token(user_id, "refresh"),
         "token_type": "Bearer",
-        "expires_in_seconds": config.JWT_ACCESS_EXPIRES_MINUTES * 60,
+        "expires_in_seconds": _ACCESS_EXPIRES_SECONDS,
     }
 
 
-def get_current_user(optional: bool = False) -> User | None:
+def get_current_user(optional: bool = False, db=None) -> User | None:
+    """Return the authenticated User, loading it once per request.
+
+    Pass ``db`` when the caller already holds a session, so the row is read
+    through it instead of checking out a second pooled connection.
+    """
     if not has_request_context():
         if optional:
             return None
         raise UnauthorizedError("Authentication required")
     user = getattr(g, "current_user", None)
+    user_id = getattr(g, "current_user_id", None)
+    if user is None and user_id:
+        # login_required only resolves the cached identity; load the full
+        # row on demand for endpoints that need it.
+        if db is not None:
+            user = db.query(User).filter_by(id=user_id).first()
+        else:
+            with get_db() as own_db:
+                user = own_db.query(User).filter_by(id=user_id).first()
+        g.current_user = user
     if user is None and not optional:
         raise UnauthorizedError("Authentication required")
     return user
@@ -90,19 +244,27 @@ def login_required(fn):
     @wraps(fn)
     def wrapper(*args, **kwargs):
         token = _extract_bearer_token()
+        if g.get("_authenticated_token") == token:
+            # Already authenticated by an outer decorator / before_request.
+            return fn(*args, **kwargs)
         payload = decode_token(token, expected_type="access")
         user_id = payload.get("sub")
         if not user_id:
             raise UnauthorizedError("Invalid token payload")
 
-        with get_db() as db:
-            user = db.query(User).filter_by(id=user_id).first()
-            if not user:
-                raise UnauthorizedError("User not found")
-            if user.is_active is False:
-                raise UnauthorizedError("Account is deactivated")
+        identity = _get_cached_user(user_id)
+        if identity is None:
+            with get_db() as db:
+                user = db.query(User).filter_by(id=user_id).first()
+                if not user:
+                    raise UnauthorizedError("User not found")
+                identity = _cache_user(user)
             g.current_user = user
-            g.current_user_id = user.id
+        if not identity.is_active:
+            raise UnauthorizedError("Account is deactivated")
+        g.current_identity = identity
+        g.current_user_id = identity.id
+        g._authenticated_token = token
 
         return fn(*args, **kwargs)
 
@@ -112,8 +274,12 @@ def login_required(fn):
 def admin_required(fn):
     @wraps(fn)
     def wrapper(*args, **kwargs):
-        user = get_current_user()
-        if not user or not bool(user.is_admin):
+        identity = (
+            getattr(g, "current_identity", None) if has_request_context() else None
+        )
+        if identity is None:
+            raise UnauthorizedError("Authentication required")
+        if not identity.is_admin:
             raise ForbiddenError("Admin access required")
         return fn(*args, **kwargs)
 
@@ -0,0 +1,25 @@
+"""JSON request body parsing."""
+
+import orjson
+from flask import request
+
+from api.errors import ValidationError
+
+
+def json_body() -> dict:
+    """Parse the request body as a JSON object, whatever its Content-Type.
+
+    An empty body parses as ``{}`` so the route's own required-field checks
+    report what is missing. Malformed JSON or a non-object body raises
+    ValidationError instead of Werkzeug's HTML 400 or a 500 from ``.get``.
+    """
+    raw = request.get_data(cache=False)
+    if not raw:
+        return {}
+    try:
+        body = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        raise ValidationError("Request body must be valid JSON")
+    if not isinstance(body, dict):
+        raise ValidationError("Request body must be a JSON object")
+    return body
@@ -1,35 +1,52 @@
-"""SQLAlchemy models for LawFlow."""
+"""SQLAlchemy models for LawFlow.
+
+Model classes are resolved lazily (PEP 562) so importing one model module
+doesn't register every table. Call ``import_all_models()`` before anything
+that needs the complete metadata, such as ``create_all``.
+"""
+
+import importlib
 
 from api.models.base import Base
-from api.models.user import User
-from api.models.document import Document, KnowledgeChunk
-from api.models.student import SubjectMastery, TopicMastery
-from api.models.session import StudySession, SessionMessage
-from api.models.assessment import Assessment, AssessmentQuestion
-from api.models.study_plan import StudyPlan, PlanTask
-from api.models.review import SpacedRepetitionCard
-from api.models.exam_blueprint import ExamBlueprint, ExamTopicWeight
-from api.models.rewards import PointLedger, Achievement, RewardsProfile
-from api.models.auth_token import AuthToken
-
-__all__ = [
-    "Base",
-    "User",
-    "Document",
-    "KnowledgeChunk",
-    "SubjectMastery",
-    "TopicMastery",
-    "StudySession",
-    "SessionMessage",
-    "Assessment",
-    "AssessmentQuestion",
-    "StudyPlan",
-    "PlanTask",
-    "SpacedRepetitionCard",
-    "ExamBlueprint",
-    "ExamTopicWeight",
-    "PointLedger",
-    "Achievement",
-    "RewardsProfile",
-    "AuthToken",
-]
+
+_MODULES: dict[str, str] = {
+    "User": "api.models.user",
+    "Document": "api.models.document",
+    "KnowledgeChunk": "api.models.document",
+    "SubjectMastery": "api.models.student",
+    "TopicMastery": "api.models.student",
+    "StudySession": "api.models.session",
+    "SessionMessage": "api.models.session",
+    "Assessment": "api.models.assessment",
+    "AssessmentQuestion": "api.models.assessment",
+    "StudyPlan": "api.models.study_plan",
+    "PlanTask": "api.models.study_plan",
+    "SpacedRepetitionCard": "api.models.review",
+    "ExamBlueprint": "api.models.exam_blueprint",
+    "ExamTopicWeight": "api.models.exam_blueprint",
+    "PointLedger": "api.models.rewards",
+    "Achievement": "api.models.rewards",
+    "RewardsProfile": "api.models.rewards",
+    "AuthToken": "api.models.auth_token",
+}
+
+__all__ = ("Base", "import_all_models", *_MODULES)
+
+
+def import_all_models() -> None:
+    """Import every model module so Base.metadata knows all tables."""
+    for module_name in dict.fromkeys(_MODULES.values()):
+        importlib.import_module(module_name)
+
+
+def __getattr__(name: str):
+    module_name = _MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_MODULES))
@@ -1,33 +1,36 @@
 """Single-use account workflow tokens."""
 
-import uuid
-from datetime import datetime, timezone
+from sqlalchemy import Column, DateTime, ForeignKey, Index, LargeBinary, String, text
 
-from sqlalchemy import Column, DateTime, ForeignKey, String
-
-from api.models.base import Base
-
-
-def _uuid() -> str:
-    return str(uuid.uuid4())
-
-
-def _now() -> datetime:
-    return datetime.now(timezone.utc)
+from api.models.base import Base, _now, _uuid, utcnow
 
 
 class AuthToken(Base):
     __tablename__ = "auth_tokens"
+    __table_args__ = (
+        # Token lookups only ever match unused tokens; consumed ones stay
+        # out of the index so it only grows with live tokens.
+        Index(
+            "idx_tok_live",
+            "token_hash",
+            "purpose",
+            unique=True,
+            postgresql_where=text("used_at IS NULL"),
+            sqlite_where=text("used_at IS NULL"),
+        ),
+        Index("idx_tok_user", "user_id"),
+    )
 
-    id = Column(String, primary_key=True, default=_uuid)
-    token_hash = Column(String, nullable=False, index=True)
-    purpose = Column(String, nullable=False, index=True)
-    user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
+    id = Column(String(36), primary_key=True, default=_uuid)
+    token_hash = Column(LargeBinary(32), nullable=False)  # raw SHA-256 digest
+    purpose = Column(String(32), nullable=False)
+    user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
     new_email = Column(String)
     expires_at = Column(DateTime, nullable=False)
     used_at = Column(DateTime)
     created_at = Column(
         DateTime,
         default=_now,
+        server_default=utcnow(),
         nullable=False,
     )
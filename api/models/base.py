@@ -1,6 +1,72 @@
 """SQLAlchemy declarative base."""
 
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import JSON, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.sql.expression import FunctionElement
+
+# JSON document column: decoded once by the driver on fetch. JSONB on
+# Postgres; TEXT-backed on SQLite. Python None is stored as SQL NULL.
+JSONType = JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql")
+
+
+def new_uuid7() -> str:
+    """Return a time-ordered UUIDv7 (RFC 9562) in canonical string form.
+
+    The leading 48 bits are the Unix time in milliseconds, so new primary
+    keys land on the right edge of their B-tree instead of at random
+    pages. The format is the same 36-char string as uuid4, so existing
+    rows and ID handling are unaffected.
+    """
+    unix_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (
+        (unix_ms & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76                      # version
+        | (rand >> 62 & 0xFFF) << 64     # rand_a
+        | 0b10 << 62                     # RFC 4122 variant
+        | (rand & 0x3FFF_FFFF_FFFF_FFFF)  # rand_b
+    )
+    return str(uuid.UUID(int=value))
+
+
+# Column defaults shared by every model.
+_UTC = timezone.utc
+
+
+def _now() -> datetime:
+    return datetime.now(_UTC)
+
+
+_uuid = new_uuid7
+
+
+class utcnow(FunctionElement):
+    """Server-side current UTC timestamp, for ``server_default``.
+
+    Timestamp columns are naive and hold UTC. Postgres' now() is in the
+    session time zone, so it is converted explicitly; SQLite's
+    CURRENT_TIMESTAMP is already UTC.
+    """
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _compile_utcnow(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utcnow, "postgresql")
+def _compile_utcnow_pg(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
 
 
 class Base(DeclarativeBase):
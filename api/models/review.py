@@ -1,56 +1,64 @@
 """Spaced repetition review card model."""
 
-import uuid
-from datetime import datetime, timezone
+from operator import attrgetter
 
-from sqlalchemy import Column, String, Integer, Float, Text, DateTime, ForeignKey, Index
+from sqlalchemy import Column, String, Integer, SmallInteger, Text, DateTime, ForeignKey, Index, text
 
-from api.models.base import Base
+from api.models.base import Base, _now, _uuid, utcnow
 
 
-def _uuid() -> str:
-    return str(uuid.uuid4())
-
-
-def _now() -> datetime:
-    return datetime.now(timezone.utc)
+_SRC_FIELDS = (
+    "id",
+    "chunk_id",
+    "subject",
+    "topic",
+    "front",
+    "back",
+    "card_type",
+    "interval_days",
+    "repetitions",
+)
+_get_src_fields = attrgetter(*_SRC_FIELDS)
 
 
 class SpacedRepetitionCard(Base):
     __tablename__ = "spaced_repetition_cards"
     __table_args__ = (
         Index("idx_src_user", "user_id"),
-        Index("idx_src_review", "next_review"),
+        # "Due now" lookups: user_id = ? AND next_review <= now. Cards with
+        # no schedule never match, so they are left out of the index.
+        Index(
+            "idx_src_due",
+            "user_id",
+            "next_review",
+            postgresql_where=text("next_review IS NOT NULL"),
+            sqlite_where=text("next_review IS NOT NULL"),
+        ),
         Index("idx_src_subject", "user_id", "subject"),
     )
 
-    id = Column(String, primary_key=True, default=_uuid)
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
-    chunk_id = Column(String, ForeignKey("knowledge_chunks.id"))
+    # Fixed-width columns first, widest alignment first, so Postgres packs
+    # rows without padding; variable-width text goes last.
+    id = Column(String(36), primary_key=True, default=_uuid)
+    created_at = Column(DateTime, default=_now, server_default=utcnow())
+    next_review = Column(DateTime)
+    last_reviewed = Column(DateTime)
+    interval_days = Column(Integer, default=1)
+    repetitions = Column(Integer, default=0)
+    # SM-2 ease factor in hundredths (250 == 2.5); SM-2 steps are whole
+    # hundredths, so integer arithmetic is exact.
+    ease_factor_x100 = Column(SmallInteger, default=250, nullable=False)
+    user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
+    chunk_id = Column(String(36), ForeignKey("knowledge_chunks.id"))
     subject = Column(String, nullable=False)
     topic = Column(String)
+    card_type = Column(String, default="concept")  # concept, rule, case_holding, element_list
     front = Column(Text, nullable=False)  # Question/prompt
     back = Column(Text, nullable=False)  # Answer/explanation
-    card_type = Column(String, default="concept")  # concept, rule, case_holding, element_list
-    ease_factor = Column(Float, default=2.5)  # SM-2 algorithm
-    interval_days = Column(Integer, default=1)
-    repetitions = Column(Integer, default=0)
-    next_review = Column(DateTime)
-    last_reviewed = Column(DateTime)
-    created_at = Column(DateTime, default=_now)
 
     def to_dict(self) -> dict:
-        return {
-            "id": self.id,
-            "chunk_id": self.chunk_id,
-            "subject": self.subject,
-            "topic": self.topic,
-            "front": self.front,
-            "back": self.back,
-            "card_type": self.card_type,
-            "ease_factor": self.ease_factor,
-            "interval_days": self.interval_days,
-            "repetitions": self.repetitions,
-            "next_review": self.next_review.isoformat() if self.next_review else None,
-            "last_reviewed": self.last_reviewed.isoformat() if self.last_reviewed else None,
-        }
+        data = dict(zip(_SRC_FIELDS, _get_src_fields(self)))
+        data["ease_factor"] = self.ease_factor_x100 / 100
+        data["next_review"] = self.next_review.isoformat() if self.next_review else None
+        data["last_reviewed"] = self.last_reviewed.isoformat() if self.last_reviewed else None
+        return data
@@ -1,54 +1,64 @@
 """Rewards system models — points ledger, achievements, and profile."""
 
-import uuid
-from datetime import datetime, timezone
+from operator import attrgetter
 
-from sqlalchemy import Column, String, Integer, Float, Text, DateTime, ForeignKey, Index
+from sqlalchemy import Column, Computed, String, Integer, Float, Date, DateTime, ForeignKey, Index
 
-from api.models.base import Base
+from api.models.base import Base, JSONType, _now, _uuid, utcnow
 
 
-def _uuid() -> str:
-    return str(uuid.uuid4())
-
-
-def _now() -> datetime:
-    return datetime.now(timezone.utc)
+_PL_FIELDS = (
+    "id",
+    "amount",
+    "activity_type",
+    "activity_id",
+    "description",
+    "bonus_type",
+)
+_get_pl_fields = attrgetter(*_PL_FIELDS)
 
 
 class PointLedger(Base):
     """Append-only transaction log. Every point earn is a row.
-    Balance = SUM(amount). Full auditability."""
+    Balance = SUM(amount), materialized in RewardsProfile.total_earned by
+    the rewards engine in the same transaction. Full auditability."""
 
     __tablename__ = "point_ledger"
     __table_args__ = (
-        Index("idx_pl_user", "user_id"),
-        Index("idx_pl_created", "created_at"),
+        Index("idx_pl_user_created", "user_id", "created_at"),
         Index("idx_pl_activity", "activity_type"),
     )
 
-    id = Column(String, primary_key=True, default=_uuid)
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
+    id = Column(String(36), primary_key=True, default=_uuid)
+    user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
     amount = Column(Integer, nullable=False)
-    activity_type = Column(String, nullable=False)
+    activity_type = Column(String(32), nullable=False)
     activity_id = Column(String)
     description = Column(String, nullable=False)
-    bonus_type = Column(String)  # null, "streak", "random_bonus", "first_time"
-    metadata_json = Column(Text)
-    created_at = Column(DateTime, default=_now)
+    bonus_type = Column(String(32))  # null, "streak", "random_bonus", "first_time"
+    metadata_json = Column(JSONType)
+    created_at = Column(DateTime, default=_now, server_default=utcnow())
 
     def to_dict(self) -> dict:
-        import json
-        return {
-            "id": self.id,
-            "amount": self.amount,
-            "activity_type": self.activity_type,
-            "activity_id": self.activity_id,
-            "description": self.description,
-            "bonus_type": self.bonus_type,
-            "metadata": json.loads(self.metadata_json) if self.metadata_json else None,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-        }
+        data = dict(zip(_PL_FIELDS, _get_pl_fields(self)))
+        data["metadata"] = self.metadata_json or None
+        data["created_at"] = self.created_at.isoformat() if self.created_at else None
+        return data
+
+
+_ACH_FIELDS = (
+    "id",
+    "achievement_key",
+    "title",
+    "description",
+    "icon",
+    "rarity",
+    "points_awarded",
+    "target_value",
+    "current_value",
+    "progress",
+)
+_get_ach_fields = attrgetter(*_ACH_FIELDS)
 
 
 class Achievement(Base):
@@ -60,34 +70,45 @@ class Achievement(Base):
         Index("idx_ach_key", "user_id", "achievement_key", unique=True),
     )
 
-    id = Column(String, primary_key=True, default=_uuid)
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
-    achievement_key = Column(String, nullable=False)
+    id = Column(String(36), primary_key=True, default=_uuid)
+    user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
+    achievement_key = Column(String(64), nullable=False)
     title = Column(String, nullable=False)
     description = Column(String, nullable=False)
-    icon = Column(String, default="trophy")
-    rarity = Column(String, default="common")  # common/uncommon/rare/legendary
+    icon = Column(String(32), default="trophy")
+    rarity = Column(String(16), default="common")  # common/uncommon/rare/legendary
     points_awarded = Column(Integer, default=0)
     unlocked_at = Column(DateTime)
     target_value = Column(Integer, default=1)
     current_value = Column(Integer, default=0)
-    created_at = Column(DateTime, default=_now)
+    # Fraction of target reached, capped at 1.0; maintained by the database.
+    progress = Column(
+        Float,
+        Computed(
+            "CASE WHEN target_value IS NULL OR target_value = 0 "
+            "OR current_value >= target_value THEN 1.0 "
+            "ELSE CAST(current_value AS FLOAT) / target_value END",
+            persisted=True,
+        ),
+    )
+    created_at = Column(DateTime, default=_now, server_default=utcnow())
 
     def to_dict(self) -> dict:
-        return {
-            "id": self.id,
-            "achievement_key": self.achievement_key,
-            "title": self.title,
-            "description": self.description,
-            "icon": self.icon,
-            "rarity": self.rarity,
-            "points_awarded": self.points_awarded,
-            "unlocked": self.unlocked_at is not None,
-            "unlocked_at": self.unlocked_at.isoformat() if self.unlocked_at else None,
-            "target_value": self.target_value,
-            "current_value": self.current_value,
-            "progress": min(self.current_value / self.target_value, 1.0) if self.target_value else 1.0,
-        }
+        data = dict(zip(_ACH_FIELDS, _get_ach_fields(self)))
+        data["unlocked"] = self.unlocked_at is not None
+        data["unlocked_at"] = self.unlocked_at.isoformat() if self.unlocked_at else None
+        return data
+
+
+_RP_FIELDS = (
+    "id",
+    "active_title",
+    "current_streak",
+    "longest_streak",
+    "total_earned",
+    "level",
+)
+_get_rp_fields = attrgetter(*_RP_FIELDS)
 
 
 class RewardsProfile(Base):
@@ -98,26 +119,20 @@ class RewardsProfile(Base):
         Index("idx_rp_user", "user_id", unique=True),
     )
 
-    id = Column(String, primary_key=True, default=_uuid)
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
+    id = Column(String(36), primary_key=True, default=_uuid)
+    user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
     active_title = Column(String, default="Law Student")
     current_streak = Column(Integer, default=0)
     longest_streak = Column(Integer, default=0)
-    last_active_date = Column(String)  # "2026-02-21" format
+    last_active_date = Column(Date)  # UTC calendar day of last activity
     total_earned = Column(Integer, default=0)
     level = Column(Integer, default=1)
-    created_at = Column(DateTime, default=_now)
-    updated_at = Column(DateTime, default=_now, onupdate=_now)
+    created_at = Column(DateTime, default=_now, server_default=utcnow())
+    updated_at = Column(DateTime, default=_now, server_default=utcnow(), onupdate=_now)
 
     def to_dict(self) -> dict:
-        return {
-            "id": self.id,
-            "active_title": self.active_title,
-            "current_streak": self.current_streak,
-            "longest_streak": self.longest_streak,
-            "last_active_date": self.last_active_date,
-            "total_earned": self.total_earned,
-            "level": self.level,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-        }
+        data = dict(zip(_RP_FIELDS, _get_rp_fields(self)))
+        data["last_active_date"] = self.last_active_date.isoformat() if self.last_active_date else None
+        data["created_at"] = self.created_at.isoformat() if self.created_at else None
+        data["updated_at"] = self.updated_at.isoformat() if self.updated_at else None
+        return data
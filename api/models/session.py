@@ -1,34 +1,43 @@
 """Study session and message models."""
 
-import uuid
-from datetime import datetime, timezone
+from operator import attrgetter
 
 from sqlalchemy import Column, String, Integer, Float, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
-from api.models.base import Base
+from api.models.base import Base, JSONType, _now, _uuid, utcnow
 
 
-def _uuid() -> str:
-    return str(uuid.uuid4())
-
-
-def _now() -> datetime:
-    return datetime.now(timezone.utc)
+_SS_FIELDS = (
+    "id",
+    "session_type",
+    "tutor_mode",
+    "subject",
+    "duration_minutes",
+    "messages_count",
+    "available_minutes",
+    "performance_score",
+    "notes",
+)
+_get_ss_fields = attrgetter(*_SS_FIELDS)
 
 
 class StudySession(Base):
     __tablename__ = "study_sessions"
     __table_args__ = (
-        Index("idx_ss_user", "user_id"),
+        # Session history / activity charts: user_id = ? ORDER BY started_at.
+        Index("idx_ss_user_started", "user_id", "started_at"),
+        # Daily tier-limit counts: user_id, session_type, created_at >= today.
+        # Covers the COUNT(*) completely, so it never touches the table.
+        Index("idx_ss_user_type_created", "user_id", "session_type", "created_at"),
     )
 
-    id = Column(String, primary_key=True, default=_uuid)
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
-    session_type = Column(String, nullable=False)  # tutor, assessment, review, free_study
+    id = Column(String(36), primary_key=True, default=_uuid)
+    user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
+    session_type = Column(String(32), nullable=False)  # tutor, assessment, review, free_study
     tutor_mode = Column(String)  # socratic, irac, issue_spot, hypo, explain, exam_strategy
     subject = Column(String)
-    topics = Column(Text)  # JSON array
+    topics = Column(JSONType)  # JSON array
     started_at = Column(DateTime, nullable=False, default=_now)
     ended_at = Column(DateTime)
     duration_minutes = Column(Float)
@@ -36,26 +45,26 @@ class StudySession(Base):
     available_minutes = Column(Integer)  # student's time budget for this session
     performance_score = Column(Float)  # 0-100
     notes = Column(Text)
-    created_at = Column(DateTime, default=_now)
+    created_at = Column(DateTime, default=_now, server_default=utcnow())
 
     messages = relationship("SessionMessage", back_populates="session", cascade="all, delete-orphan")
 
     def to_dict(self) -> dict:
-        import json
-        return {
-            "id": self.id,
-            "session_type": self.session_type,
-            "tutor_mode": self.tutor_mode,
-            "subject": self.subject,
-            "topics": json.loads(self.topics) if self.topics else [],
-            "started_at": self.started_at.isoformat() if self.started_at else None,
-            "ended_at": self.ended_at.isoformat() if self.ended_at else None,
-            "duration_minutes": self.duration_minutes,
-            "messages_count": self.messages_count,
-            "available_minutes": self.available_minutes,
-            "performance_score": self.performance_score,
-            "notes": self.notes,
-        }
+        data = dict(zip(_SS_FIELDS, _get_ss_fields(self)))
+        data["topics"] = self.topics or []
+        data["started_at"] = self.started_at.isoformat() if self.started_at else None
+        data["ended_at"] = self.ended_at.isoformat() if self.ended_at else None
+        return data
+
+
+_SMSG_FIELDS = (
+    "id",
+    "session_id",
+    "role",
+    "content",
+    "message_index",
+)
+_get_smsg_fields = attrgetter(*_SMSG_FIELDS)
 
 
 class SessionMessage(Base):
@@ -65,25 +74,19 @@ class SessionMessage(Base):
         Index("idx_smsg_session", "session_id"),
     )
 
-    id = Column(String, primary_key=True, default=_uuid)
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
-    session_id = Column(String, ForeignKey("study_sessions.id", ondelete="CASCADE"), nullable=False)
-    role = Column(String, nullable=False)  # user, assistant, system
+    id = Column(String(36), primary_key=True, default=_uuid)
+    user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
+    session_id = Column(String(36), ForeignKey("study_sessions.id", ondelete="CASCADE"), nullable=False)
+    role = Column(String(16), nullable=False)  # user, assistant, system
     content = Column(Text, nullable=False)
     message_index = Column(Integer, nullable=False)
-    metadata_json = Column(Text)  # JSON: topic tags, performance signals
-    created_at = Column(DateTime, default=_now)
+    metadata_json = Column(JSONType)  # JSON: topic tags, performance signals
+    created_at = Column(DateTime, default=_now, server_default=utcnow())
 
     session = relationship("StudySession", back_populates="messages")
 
     def to_dict(self) -> dict:
-        import json
-        return {
-            "id": self.id,
-            "session_id": self.session_id,
-            "role": self.role,
-            "content": self.content,
-            "message_index": self.message_index,
-            "metadata": json.loads(self.metadata_json) if self.metadata_json else None,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-        }
+        data = dict(zip(_SMSG_FIELDS, _get_smsg_fields(self)))
+        data["metadata"] = self.metadata_json or None
+        data["created_at"] = self.created_at.isoformat() if self.created_at else None
+        return data
@@ -1,30 +1,32 @@
 """Student mastery tracking models."""
 
-import uuid
-from datetime import datetime, timezone
+from operator import attrgetter
 
 from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Index, UniqueConstraint
 
-from api.models.base import Base
+from api.models.base import Base, _now, _uuid, utcnow
 
 
-def _uuid() -> str:
-    return str(uuid.uuid4())
-
-
-def _now() -> datetime:
-    return datetime.now(timezone.utc)
+_SM_FIELDS = (
+    "id",
+    "subject",
+    "display_name",
+    "mastery_score",
+    "total_study_time_minutes",
+    "sessions_count",
+    "assessments_count",
+)
+_get_sm_fields = attrgetter(*_SM_FIELDS)
 
 
 class SubjectMastery(Base):
     __tablename__ = "subject_mastery"
     __table_args__ = (
-        UniqueConstraint("user_id", "subject"),
-        Index("idx_sm_user", "user_id"),
+        UniqueConstraint("user_id", "subject"),  # also serves user_id lookups
     )
 
-    id = Column(String, primary_key=True, default=_uuid)
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
+    id = Column(String(36), primary_key=True, default=_uuid)
+    user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
     subject = Column(String, nullable=False)
     display_name = Column(String, nullable=False)
     mastery_score = Column(Float, default=0.0)  # 0-100
@@ -32,33 +34,38 @@ class SubjectMastery(Base):
     sessions_count = Column(Integer, default=0)
     assessments_count = Column(Integer, default=0)
     last_studied_at = Column(DateTime)
-    created_at = Column(DateTime, default=_now)
-    updated_at = Column(DateTime, default=_now, onupdate=_now)
+    created_at = Column(DateTime, default=_now, server_default=utcnow())
+    updated_at = Column(DateTime, default=_now, server_default=utcnow(), onupdate=_now)
 
     def to_dict(self) -> dict:
-        return {
-            "id": self.id,
-            "subject": self.subject,
-            "display_name": self.display_name,
-            "mastery_score": self.mastery_score,
-            "total_study_time_minutes": self.total_study_time_minutes,
-            "sessions_count": self.sessions_count,
-            "assessments_count": self.assessments_count,
-            "last_studied_at": self.last_studied_at.isoformat() if self.last_studied_at else None,
-        }
+        data = dict(zip(_SM_FIELDS, _get_sm_fields(self)))
+        data["last_studied_at"] = self.last_studied_at.isoformat() if self.last_studied_at else None
+        return data
+
+
+_TM_FIELDS = (
+    "id",
+    "subject",
+    "topic",
+    "display_name",
+    "mastery_score",
+    "confidence",
+    "exposure_count",
+    "correct_count",
+    "incorrect_count",
+)
+_get_tm_fields = attrgetter(*_TM_FIELDS)
 
 
 class TopicMastery(Base):
     __tablename__ = "topic_mastery"
     __table_args__ = (
-        UniqueConstraint("user_id", "subject", "topic"),
-        Index("idx_tm_user", "user_id"),
-        Index("idx_tm_subject", "user_id", "subject"),
+        UniqueConstraint("user_id", "subject", "topic"),  # also serves user_id / subject prefixes
         Index("idx_tm_score", "mastery_score"),
     )
 
-    id = Column(String, primary_key=True, default=_uuid)
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
+    id = Column(String(36), primary_key=True, default=_uuid)
+    user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
     subject = Column(String, nullable=False)
     topic = Column(String, nullable=False)
     display_name = Column(String, nullable=False)
@@ -69,20 +76,11 @@ class TopicMastery(Base):
     incorrect_count = Column(Integer, default=0)
     last_tested_at = Column(DateTime)
     last_studied_at = Column(DateTime)
-    created_at = Column(DateTime, default=_now)
-    updated_at = Column(DateTime, default=_now, onupdate=_now)
+    created_at = Column(DateTime, default=_now, server_default=utcnow())
+    updated_at = Column(DateTime, default=_now, server_default=utcnow(), onupdate=_now)
 
     def to_dict(self) -> dict:
-        return {
-            "id": self.id,
-            "subject": self.subject,
-            "topic": self.topic,
-            "display_name": self.display_name,
-            "mastery_score": self.mastery_score,
-            "confidence": self.confidence,
-            "exposure_count": self.exposure_count,
-            "correct_count": self.correct_count,
-            "incorrect_count": self.incorrect_count,
-            "last_tested_at": self.last_tested_at.isoformat() if self.last_tested_at else None,
-            "last_studied_at": self.last_studied_at.isoformat() if self.last_studied_at else None,
-        }
+        data = dict(zip(_TM_FIELDS, _get_tm_fields(self)))
+        data["last_tested_at"] = self.last_tested_at.isoformat() if self.last_tested_at else None
+        data["last_studied_at"] = self.last_studied_at.isoformat() if self.last_studied_at else None
+        return data
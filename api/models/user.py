@@ -1,25 +1,85 @@
 """User account and subscription model."""
 
-import uuid
-from datetime import datetime, timezone
+from operator import attrgetter
 
-from sqlalchemy import Boolean, Column, DateTime, String
+from sqlalchemy import Boolean, Column, DateTime, Index, String, text
 
-from api.models.base import Base
+from api.models.base import Base, _now, _uuid, utcnow
 
 
-def _uuid() -> str:
-    return str(uuid.uuid4())
+_USER_FIELDS = (
+    "id",
+    "email",
+    "display_name",
+    "avatar_url",
+    "tier",
+    "subscription_status",
+    "bio",
+    "email_verified",
+    "is_admin",
+    "is_active",
+    "created_at",
+    "updated_at",
+)
+_get_user_fields = attrgetter(*_USER_FIELDS)
 
 
-def _now() -> datetime:
-    return datetime.now(timezone.utc)
+# Indexes built only on Postgres; the trigram ones also need pg_trgm.
+TRIGRAM_INDEXES = frozenset({"idx_users_email_trgm", "idx_users_name_trgm"})
+POSTGRES_ONLY_INDEXES = TRIGRAM_INDEXES | {
+    "idx_users_pro",
+    "idx_users_not_active",
+    "idx_users_unverified",
+    "idx_users_admin",
+}
+
+
+def _pg_trgm_installed(ddl, target, bind, **kw) -> bool:
+    # init_database installs pg_trgm when the database role is allowed to;
+    # otherwise the trigram indexes are skipped and search still works.
+    return bind.execute(
+        text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+    ).first() is not None
 
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Admin search is an unanchored lower(col) LIKE '%q%'; trigram GIN
+        # indexes serve it on Postgres. No SQLite equivalent, so skipped there.
+        Index(
+            "idx_users_email_trgm",
+            text("lower(email) gin_trgm_ops"),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql", callable_=_pg_trgm_installed),
+        Index(
+            "idx_users_name_trgm",
+            text("lower(display_name) gin_trgm_ops"),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql", callable_=_pg_trgm_installed),
+        # Admin stats counts; each covers a small subset of users and makes
+        # its COUNT an index-only scan.
+        Index("idx_users_pro", "id", postgresql_where=text("tier = 'pro'"))
+        .ddl_if(dialect="postgresql"),
+        Index("idx_users_not_active", "id", postgresql_where=text("is_active IS NOT TRUE"))
+        .ddl_if(dialect="postgresql"),
+        Index("idx_users_unverified", "id", postgresql_where=text("email_verified IS FALSE"))
+        .ddl_if(dialect="postgresql"),
+        Index("idx_users_admin", "id", postgresql_where=text("is_admin IS TRUE"))
+        .ddl_if(dialect="postgresql"),
+        # Stripe webhook lookups. Declared here rather than as unique=True on
+        # the column: databases that gained the column through ADD COLUMN
+        # never got the inline constraint, and this gets backfilled.
+        Index(
+            "idx_users_stripe_customer",
+            "stripe_customer_id",
+            unique=True,
+            postgresql_where=text("stripe_customer_id IS NOT NULL"),
+            sqlite_where=text("stripe_customer_id IS NOT NULL"),
+        ),
+    )
 
-    id = Column(String, primary_key=True, default=_uuid)
+    id = Column(String(36), primary_key=True, default=_uuid)
     email = Column(String, unique=True, nullable=False, index=True)
     password_hash = Column(String, nullable=False)
     display_name = Column(String, default="Law Student")
@@ -27,8 +87,8 @@ class User(Base):
     bio = Column(String, default="")
 
     # Subscription / billing fields
-    tier = Column(String, default="free")  # free | pro
-    stripe_customer_id = Column(String, unique=True)
+    tier = Column(String(16), default="free")  # free | pro
+    stripe_customer_id = Column(String)
     stripe_subscription_id = Column(String)
     subscription_status = Column(
         String,
@@ -39,26 +99,29 @@ class User(Base):
     email_verified = Column(Boolean, default=False)
     is_admin = Column(Boolean, default=False)
     is_active = Column(Boolean, default=True)
+    # Per-user subject taxonomy and achievements have been created.
+    seeded = Column(Boolean, default=False)
+
+    created_at = Column(DateTime, default=_now, server_default=utcnow())
+    updated_at = Column(DateTime, default=_now, server_default=utcnow(), onupdate=_now)
+
+    @classmethod
+    def columns_for_dict(cls) -> tuple:
+        """Columns to select for dict_from_row(), in _USER_FIELDS order."""
+        return tuple(getattr(cls, name) for name in _USER_FIELDS)
 
-    created_at = Column(DateTime, default=_now)
-    updated_at = Column(DateTime, default=_now, onupdate=_now)
+    @staticmethod
+    def dict_from_row(row) -> dict:
+        """Serialize a row selected with columns_for_dict() without loading
+        an ORM instance. Timestamps are left as datetimes; the orjson
+        provider encodes them to the same ISO 8601 strings isoformat()
+        produced."""
+        data = dict(zip(_USER_FIELDS, row))
+        data["bio"] = data["bio"] or ""
+        data["email_verified"] = bool(data["email_verified"])
+        data["is_admin"] = bool(data["is_admin"])
+        data["is_active"] = bool(data["is_active"])
+        return data
 
     def to_dict(self) -> dict:
-        return {
-            "id": self.id,
-            "email": self.email,
-            "display_name": self.display_name,
-            "avatar_url": self.avatar_url,
-            "bio": self.bio or "",
-            "tier": self.tier,
-            "subscription_status": self.subscription_status,
-            "email_verified": bool(self.email_verified),
-            "is_admin": bool(self.is_admin),
-            "is_active": bool(self.is_active),
-            "created_at": (
-                self.created_at.isoformat() if self.created_at else None
-            ),
-            "updated_at": (
-                self.updated_at.isoformat() if self.updated_at else None
-            ),
-        }
+        return self.dict_from_row(_get_user_fields(self))
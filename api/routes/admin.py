@@ -1,52 +1,107 @@
 """Administrative account management endpoints."""
 
+import base64
 import logging
+import threading
+import time
+from datetime import datetime
 
 from flask import Blueprint, jsonify, request
+from sqlalchemy import func, select, tuple_
 from sqlalchemy.orm import Session
 
 from api.errors import NotFoundError, ValidationError
 from api.middleware.auth import (
     admin_required,
     get_current_user_id,
+    invalidate_cached_user,
     login_required,
 )
 from api.models.user import User
 from api.services.account_lifecycle import delete_user_account
 from api.services.database import get_db
+from api.services.tier_limits import invalidate_tier_status
 
 bp = Blueprint("admin", __name__, url_prefix="/api/admin")
 logger = logging.getLogger(__name__)
 
+# Dashboard polls hit /stats repeatedly; serve counts from a short-lived
+# per-process cache. Admin edits here invalidate it; sign-ups and email
+# verifications show up once the entry expires.
+_STATS_CACHE_TTL_SECONDS = 30
+_stats_cache: tuple[float, dict] | None = None
+_stats_cache_lock = threading.Lock()
+
+
+def _invalidate_stats_cache() -> None:
+    global _stats_cache
+    with _stats_cache_lock:
+        _stats_cache = None
+
+
+def _encode_cursor(row) -> str:
+    # users.created_at is nullable; a NULL encodes as an empty timestamp.
+    created_at = row.created_at.isoformat() if row.created_at else ""
+    raw = f"{created_at}|{row.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime | None, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, user_id = raw.split("|", 1)
+        return (datetime.fromisoformat(created_at) if created_at else None), user_id
+    except (ValueError, UnicodeDecodeError):
+        raise ValidationError("Invalid cursor")
+
+
+def _after_cursor(cursor: str):
+    """Filter for rows after the cursor in created_at DESC NULLS LAST, id DESC order."""
+    created_at, user_id = _decode_cursor(cursor)
+    if created_at is None:
+        return User.created_at.is_(None) & (User.id < user_id)
+    return (tuple_(User.created_at, User.id) < (created_at, user_id)) | User.created_at.is_(None)
+
 
 @bp.route("/users", methods=["GET"])
 @login_required
 @admin_required
 def list_users():
-    page = max(request.args.get("page", 1, type=int), 1)
+    """Newest-first user list with keyset pagination.
+
+    Pass the returned next_cursor as ?cursor= to fetch the following page;
+    it is null on the last page. total is only computed for the first page.
+    """
+    cursor = request.args.get("cursor")
     page_size = min(max(request.args.get("page_size", 20, type=int), 1), 100)
     q = (request.args.get("q", "") or "").strip().lower()
 
     with get_db() as db_ctx:
         db: Session = db_ctx
-        query = db.query(User)
+        # Read-only listing: select plain columns instead of ORM instances.
+        query = db.query(*User.columns_for_dict())
         if q:
             like = f"%{q}%"
+            # q is already lowercased; matches the trigram indexes on users.
             query = query.filter(
-                (User.email.ilike(like)) | (User.display_name.ilike(like))
+                func.lower(User.email).like(like)
+                | func.lower(User.display_name).like(like)
             )
-        total = query.count()
-        users = (
-            query.order_by(User.created_at.desc())
-            .offset((page - 1) * page_size)
-            .limit(page_size)
+        total = None if cursor else query.count()
+        if cursor:
+            query = query.filter(_after_cursor(cursor))
+        rows = (
+            query.order_by(User.created_at.desc().nulls_last(), User.id.desc())
+            .limit(page_size + 1)
             .all()
         )
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
         return jsonify(
             {
-                "items": [u.to_dict() for u in users],
-                "page": page,
+                "items": [User.dict_from_row(r) for r in rows],
                 "page_size": page_size,
+                "next_cursor": _encode_cursor(rows[-1]) if has_more else None,
                 "total": total,
             }
         )
@@ -89,6 +144,8 @@ def update_user(user_id: str):
             user.is_admin = bool(body.get("is_admin"))
 
         db.flush()
+        invalidate_cached_user(user.id)
+        _invalidate_stats_cache()
         logger.info(
             (
                 "admin_user_update admin=%s target=%s tier=%s "
@@ -100,7 +157,10 @@ def update_user(user_id: str):
             user.is_active,
             user.is_admin,
         )
-        return jsonify(user.to_dict())
+        payload = user.to_dict()
+    # The tier change is committed now; drop the status cached before it.
+    invalidate_tier_status(user_id)
+    return jsonify(payload)
 
 
 @bp.route("/users/<user_id>", methods=["DELETE"])
@@ -114,29 +174,45 @@ def delete_user(user_id: str):
         if not user:
             raise NotFoundError("User not found")
         delete_user_account(db, user)
+        invalidate_cached_user(user_id)
+        _invalidate_stats_cache()
         logger.info("admin_user_delete admin=%s target=%s", admin_id, user_id)
     return jsonify({"status": "ok"})
 
 
+def _count_users(*criteria):
+    return select(func.count()).select_from(User).where(*criteria).scalar_subquery()
+
+
 @bp.route("/stats", methods=["GET"])
 @login_required
 @admin_required
 def stats():
+    global _stats_cache
+    with _stats_cache_lock:
+        if _stats_cache is not None and _stats_cache[0] > time.monotonic():
+            return jsonify(_stats_cache[1])
+
+    # One round trip; on Postgres each subquery is an index-only scan of
+    # the primary key or one of the partial idx_users_* indexes.
     with get_db() as db_ctx:
         db: Session = db_ctx
-        total_users = db.query(User).count()
-        pro_users = db.query(User).filter(User.tier == "pro").count()
-        active_users = db.query(User).filter(User.is_active.is_(True)).count()
-        unverified_users = db.query(User).filter(
-            User.email_verified.is_(False)
-        ).count()
-        admin_users = db.query(User).filter(User.is_admin.is_(True)).count()
-    return jsonify(
-        {
-            "total_users": total_users,
-            "pro_users": pro_users,
-            "active_users": active_users,
-            "unverified_users": unverified_users,
-            "admin_users": admin_users,
-        }
-    )
+        row = db.query(
+            _count_users(),
+            _count_users(User.tier == "pro"),
+            _count_users(User.is_active.isnot(True)),
+            _count_users(User.email_verified.is_(False)),
+            _count_users(User.is_admin.is_(True)),
+        ).one()
+    total_users, pro_users, not_active_users, unverified_users, admin_users = row
+    active_users = total_users - not_active_users
+    result = {
+        "total_users": total_users,
+        "pro_users": pro_users,
+        "active_users": active_users,
+        "unverified_users": unverified_users,
+        "admin_users": admin_users,
+    }
+    with _stats_cache_lock:
+        _stats_cache = (time.monotonic() + _STATS_CACHE_TTL_SECONDS, result)
+    return jsonify(result)
@@ -1,26 +1,32 @@
 """Authentication and user profile routes."""
 
+import io
 import logging
-import re
+import mimetypes
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
-import bcrypt
-from flask import Blueprint, jsonify, request, send_from_directory
+from flask import Blueprint, Response, jsonify, request, send_from_directory
+from sqlalchemy import delete, text, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only
+from werkzeug.exceptions import NotFound
 from werkzeug.utils import secure_filename
 
 from api.config import config
 from api.errors import APIError, NotFoundError, UnauthorizedError, ValidationError
 from api.middleware.auth import (
     decode_token,
-    get_current_user,
     get_current_user_id,
+    invalidate_cached_user,
     issue_auth_tokens,
     login_required,
 )
+from api.middleware.request_body import json_body
 from api.models.assessment import Assessment, AssessmentQuestion
 from api.models.auth_token import AuthToken
+from api.models.base import new_uuid7
 from api.models.document import Document, KnowledgeChunk
 from api.models.exam_blueprint import ExamBlueprint, ExamTopicWeight
 from api.models.rewards import Achievement, PointLedger, RewardsProfile
@@ -37,26 +43,34 @@ from api.services.email import (
     send_password_reset_email,
     send_verification_email,
 )
+from api.services.password import check_password, hash_password
 from api.services.rate_limiter import limiter
 from api.services.subject_taxonomy import seed_subject_taxonomy
 from api.services.token_utils import (
     generate_raw_token,
     hash_token,
-    tokens_match,
 )
 
 bp = Blueprint("auth", __name__, url_prefix="/api/auth")
 logger = logging.getLogger(__name__)
 
-_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
-_ALLOWED_AVATAR_EXTENSIONS = {"jpg", "jpeg", "png", "gif", "webp"}
-_AVATAR_FILENAME_RE = re.compile(r"^[a-zA-Z0-9-]+\.(?:jpg|jpeg|png|gif|webp)$", re.IGNORECASE)
+_ALLOWED_AVATAR_EXTENSIONS = frozenset({"jpg", "jpeg", "png", "gif", "webp"})
+_PASSWORD_SPECIALS = frozenset("!@#$%^&*-_=+[]{}|;:,.<>?")
 _MAX_AVATAR_SIZE_BYTES = 2 * 1024 * 1024
+# Multipart boundaries and part headers ride on top of the file itself.
+_MAX_AVATAR_REQUEST_BYTES = _MAX_AVATAR_SIZE_BYTES + 16 * 1024
+_AVATAR_SIZE_PX = (256, 256)
+# Avatar URLs carry a version query, so browsers may cache the file for good.
+_AVATAR_MAX_AGE_SECONDS = 365 * 24 * 3600
 _AVATAR_DIR = Path(__file__).resolve().parent.parent.parent / "data" / "uploads" / "avatars"
+_AVATAR_DIR.mkdir(parents=True, exist_ok=True)
+_AVATAR_URL_PREFIX = "/api/auth/avatar/"
 
 _TOKEN_VERIFY_EMAIL = "verify_email"
 _TOKEN_RESET_PASSWORD = "reset_password"
 _TOKEN_CHANGE_EMAIL = "change_email"
+# Used or expired tokens are kept this long, then pruned on the next issue.
+_TOKEN_RETENTION = timedelta(days=7)
 
 
 def _utcnow() -> datetime:
@@ -67,6 +81,20 @@ def _normalize_email(value: str) -> str:
     return (value or "").strip().lower()
 
 
+def _is_valid_email(email: str) -> bool:
+    """Loose shape check: one "@", no whitespace, and a dot inside the domain.
+
+    A plain scan rather than a regex, so long dotted input can't backtrack.
+    """
+    local, _, domain = email.partition("@")
+    return (
+        bool(local)
+        and "." in domain[1:-1]
+        and "@" not in domain
+        and email.split() == [email]
+    )
+
+
 def _validate_password(password: str) -> None:
     """Validate password meets security requirements.
 
@@ -81,54 +109,127 @@ def _validate_password(password: str) -> None:
 
     if len(pwd) < 8:
         raise ValidationError("Password must be at least 8 characters")
-    if not any(c.isupper() for c in pwd):
+    # Class checks run over the distinct characters only.
+    chars = set(pwd)
+    if not any(c.isupper() for c in chars):
         raise ValidationError(
             "Password must contain at least one uppercase letter"
         )
-    if not any(c.islower() for c in pwd):
+    if not any(c.islower() for c in chars):
         raise ValidationError(
             "Password must contain at least one lowercase letter"
         )
-    if not any(c.isdigit() for c in pwd):
+    if not any(c.isdigit() for c in chars):
         raise ValidationError("Password must contain at least one digit")
-    if not any(c in "!@#$%^&*-_=+[]{}|;:,.<>?" for c in pwd):
+    if chars.isdisjoint(_PASSWORD_SPECIALS):
         raise ValidationError(
             "Password must contain at least one special character "
             "(!@#$%^&* etc.)"
         )
 
 
-def _hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+def _verify_current_password(user_id: str, password: str) -> None:
+    """Check a logged-in user's password without holding a DB session.
+
+    bcrypt is deliberately slow; the row is read in a short session so the
+    pooled connection is released before hashing starts.
+    """
+    with get_db() as db:
+        password_hash = (
+            db.query(User.password_hash).filter_by(id=user_id).scalar()
+        )
+    if password_hash is None:
+        raise UnauthorizedError("User not found")
+    if not check_password(password, password_hash):
+        raise UnauthorizedError("Current password is incorrect")
+
+
+def _email_taken(db, email: str, exclude_user_id: str | None = None) -> bool:
+    """SELECT EXISTS(...) on users.email; no User row is loaded."""
+    query = db.query(User.id).filter(User.email == email)
+    if exclude_user_id is not None:
+        query = query.filter(User.id != exclude_user_id)
+    return db.query(query.exists()).scalar()
+
 
+def _insert_user_if_new(db, **values) -> User | None:
+    """Insert a user unless the email is taken; None on conflict.
 
-def _check_password(password: str, password_hash: str) -> bool:
+    One INSERT ... ON CONFLICT (email) DO NOTHING RETURNING statement, so
+    there is no check-then-insert race between concurrent sign-ups.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        insert = postgresql.insert
+    elif dialect == "sqlite":
+        insert = sqlite.insert
+    else:
+        if _email_taken(db, values["email"]):
+            return None
+        user = User(**values)
+        db.add(user)
+        db.flush()
+        return user
+    stmt = (
+        insert(User)
+        .values(**values)
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User)
+    )
+    return db.execute(stmt).scalar_one_or_none()
+
+
+def _seed_user_data(user_id: str) -> None:
+    """Create the user's subject taxonomy and achievements, then flag it."""
     try:
-        return bcrypt.checkpw(password.encode("utf-8"), password_hash.encode("utf-8"))
-    except ValueError:
-        return False
+        seed_subject_taxonomy(user_id=user_id)
+    except IntegrityError:
+        # Legacy DB may still have old unique indexes.
+        pass
+    seed_achievements(user_id=user_id)
+    with get_db() as db:
+        db.query(User).filter_by(id=user_id).update(
+            {"seeded": True},
+            synchronize_session=False,
+        )
+
+
+# Tables whose pre-auth rows (user_id IS NULL) the first user adopts.
+_CLAIMABLE_MODELS: tuple[type, ...] = (
+    SubjectMastery,
+    TopicMastery,
+    StudySession,
+    SessionMessage,
+    Assessment,
+    AssessmentQuestion,
+    StudyPlan,
+    PlanTask,
+    SpacedRepetitionCard,
+    ExamBlueprint,
+    ExamTopicWeight,
+    Document,
+    KnowledgeChunk,
+    PointLedger,
+    Achievement,
+    RewardsProfile,
+)
+# Postgres batch for the same claim; psycopg2 sends the joined statements
+# in one round trip.
+_CLAIM_UNOWNED_PG_SQL = text(
+    ";\n".join(
+        f"UPDATE {model.__tablename__} SET user_id = :uid WHERE user_id IS NULL"
+        for model in _CLAIMABLE_MODELS
+    )
+)
 
 
 def _claim_unowned_data(db, user_id: str) -> None:
-    models = [
-        SubjectMastery,
-        TopicMastery,
-        StudySession,
-        SessionMessage,
-        Assessment,
-        AssessmentQuestion,
-        StudyPlan,
-        PlanTask,
-        SpacedRepetitionCard,
-        ExamBlueprint,
-        ExamTopicWeight,
-        Document,
-        KnowledgeChunk,
-        PointLedger,
-        Achievement,
-        RewardsProfile,
-    ]
-    for model in models:
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(_CLAIM_UNOWNED_PG_SQL, {"uid": user_id})
+        return
+    # SQLite runs in-process (no round trips) and its driver rejects
+    # multi-statement strings.
+    for model in _CLAIMABLE_MODELS:
         db.query(model).filter(model.user_id.is_(None)).update(
             {"user_id": user_id},
             synchronize_session=False,
@@ -143,74 +244,100 @@ def _issue_account_token(
     new_email: str | None = None,
 ) -> str:
     raw = generate_raw_token()
-    expiry = _utcnow() + timedelta(minutes=config.EMAIL_TOKEN_TTL_MINUTES)
-
-    db.query(AuthToken).filter(
-        AuthToken.user_id == user_id,
-        AuthToken.purpose == purpose,
-        AuthToken.used_at.is_(None),
-    ).update({"used_at": _utcnow()}, synchronize_session=False)
-
-    db.add(
-        AuthToken(
-            token_hash=hash_token(raw),
-            purpose=purpose,
-            user_id=user_id,
-            new_email=new_email,
-            expires_at=expiry,
+    now = _utcnow()
+    expiry = now + timedelta(minutes=config.EMAIL_TOKEN_TTL_MINUTES)
+
+    # Retire the user's live tokens for this purpose, and prune their dead
+    # tokens so the table stays bounded without a scheduled cleanup job.
+    # Live tokens already past the cutoff are pruned rather than retired,
+    # so the two statements never touch the same row.
+    cutoff = now - _TOKEN_RETENTION
+    invalidate = (
+        update(AuthToken)
+        .where(
+            AuthToken.user_id == user_id,
+            AuthToken.purpose == purpose,
+            AuthToken.used_at.is_(None),
+            AuthToken.expires_at >= cutoff,
         )
+        .values(used_at=now)
+    )
+    prune = delete(AuthToken).where(
+        AuthToken.user_id == user_id,
+        (AuthToken.used_at < cutoff) | (AuthToken.expires_at < cutoff),
     )
+    values = {
+        "id": new_uuid7(),
+        "token_hash": hash_token(raw),
+        "purpose": purpose,
+        "user_id": user_id,
+        "new_email": new_email,
+        "expires_at": expiry,
+        "created_at": now,
+    }
+
+    if db.get_bind().dialect.name == "postgresql":
+        # One round trip: the UPDATE and DELETE ride along as data-modifying
+        # CTEs of the INSERT.
+        db.execute(
+            postgresql.insert(AuthToken)
+            .values(**values)
+            .add_cte(invalidate.cte("invalidated"))
+            .add_cte(prune.cte("pruned"))
+        )
+    else:
+        db.execute(invalidate)
+        db.execute(prune)
+        db.add(AuthToken(**values))
     logger.info("auth_token_created user=%s purpose=%s", user_id, purpose)
     return raw
 
 
 def _consume_account_token(db, raw_token: str, purpose: str) -> AuthToken:
-    token_hash = hash_token(raw_token)
+    # Matching on the SHA-256 digest is the whole check: equality on the
+    # hash reveals nothing about the raw token, so no second compare.
+    now = _utcnow()
     token = db.query(AuthToken).filter(
         AuthToken.purpose == purpose,
-        AuthToken.token_hash == token_hash,
+        AuthToken.token_hash == hash_token(raw_token),
         AuthToken.used_at.is_(None),
+        AuthToken.expires_at > now,
     ).first()
     if not token:
         logger.warning("auth_token_invalid purpose=%s", purpose)
         raise ValidationError("Invalid or expired token")
-    if not tokens_match(raw_token, token.token_hash):
-        logger.warning("auth_token_compare_failed purpose=%s", purpose)
-        raise ValidationError("Invalid or expired token")
-    if token.expires_at and token.expires_at <= _utcnow():
-        logger.warning("auth_token_expired user=%s purpose=%s", token.user_id, purpose)
-        raise ValidationError("Invalid or expired token")
-    token.used_at = _utcnow()
+    token.used_at = now
     logger.info("auth_token_consumed user=%s purpose=%s", token.user_id, purpose)
     return token
 
 
 @bp.route("/register", methods=["POST"])
 def register():
-    body = request.get_json(force=True)
+    body = json_body()
     email = _normalize_email(body.get("email", ""))
     password = body.get("password", "")
     display_name = (body.get("display_name", "") or "").strip() or "Law Student"
     claim_existing_data = bool(body.get("claim_existing_data", True))
 
-    if not _EMAIL_RE.match(email):
+    if not _is_valid_email(email):
         raise ValidationError("Valid email is required")
     _validate_password(password)
 
+    # Hash before opening the session so bcrypt doesn't pin a connection.
+    password_hash = hash_password(password)
+
     verification_token = ""
     with get_db() as db:
-        if db.query(User).filter_by(email=email).first():
-            raise ValidationError("An account with that email already exists")
-
-        user = User(
+        user = _insert_user_if_new(
+            db,
             email=email,
-            password_hash=_hash_password(password),
+            password_hash=password_hash,
             display_name=display_name,
             tier="free",
             subscription_status="none",
         )
-        db.add(user)
-        db.flush()
+        if user is None:
+            raise ValidationError("An account with that email already exists")
 
         user_count = db.query(User).count()
         if claim_existing_data and user_count == 1:
@@ -227,12 +354,7 @@ def register():
         user_dict = user.to_dict()
 
     # Seed mastery taxonomy for the new user in a separate transaction.
-    try:
-        seed_subject_taxonomy(user_id=user_id)
-    except IntegrityError:
-        # Legacy DB may still have old unique indexes.
-        pass
-    seed_achievements(user_id=user_id)
+    _seed_user_data(user_id)
 
     try:
         send_verification_email(email, verification_token)
@@ -249,7 +371,7 @@ def register():
 
 @bp.route("/login", methods=["POST"])
 def login():
-    body = request.get_json(force=True)
+    body = json_body()
     email = _normalize_email(body.get("email", ""))
     password = body.get("password", "")
     if not email or not password:
@@ -257,25 +379,26 @@ def login():
 
     with get_db() as db:
         user = db.query(User).filter_by(email=email).first()
-        if not user or not _check_password(password, user.password_hash):
-            raise UnauthorizedError("Invalid email or password")
-        if user.is_active is False:
-            raise UnauthorizedError("Account is deactivated")
-        try:
-            seed_subject_taxonomy(user_id=user.id)
-        except IntegrityError:
-            pass
-        seed_achievements(user_id=user.id)
-        payload = {
-            "user": user.to_dict(),
-            **issue_auth_tokens(user.id),
-        }
+    # Verify after the session is closed; bcrypt would otherwise hold the
+    # pooled connection for its full cost.
+    if not user or not check_password(password, user.password_hash):
+        raise UnauthorizedError("Invalid email or password")
+    if user.is_active is False:
+        raise UnauthorizedError("Account is deactivated")
+    # Accounts are seeded at registration; this only catches ones created
+    # before the seeded flag existed.
+    if not user.seeded:
+        _seed_user_data(user.id)
+    payload = {
+        "user": user.to_dict(),
+        **issue_auth_tokens(user.id),
+    }
     return jsonify(payload)
 
 
 @bp.route("/refresh", methods=["POST"])
 def refresh():
-    body = request.get_json(force=True)
+    body = json_body()
     refresh_token = (body.get("refresh_token") or "").strip()
     if not refresh_token:
         raise ValidationError("refresh_token is required")
@@ -300,15 +423,23 @@ def refresh():
 @bp.route("/me", methods=["GET"])
 @login_required
 def me():
-    user = get_current_user()
-    return jsonify(user.to_dict())
+    # Read-only: select the serialized columns instead of an ORM instance.
+    with get_db() as db:
+        row = (
+            db.query(*User.columns_for_dict())
+            .filter_by(id=get_current_user_id())
+            .first()
+        )
+    if row is None:
+        raise UnauthorizedError("Authentication required")
+    return jsonify(User.dict_from_row(row))
 
 
 @bp.route("/update-profile", methods=["PUT"])
 @login_required
 def update_profile():
     user_id = get_current_user_id()
-    body = request.get_json(force=True)
+    body = json_body()
     display_name = body.get("display_name")
     avatar_url = body.get("avatar_url")
     bio = body.get("bio")
@@ -333,77 +464,148 @@ def update_profile():
         return jsonify(user.to_dict())
 
 
+def _uploaded_avatar_ext(avatar_url: str | None, user_id: str) -> str | None:
+    """Extension of the user's uploaded avatar file named by ``avatar_url``.
+
+    None when the URL is empty or points anywhere else; update_profile
+    accepts arbitrary avatar URLs.
+    """
+    if not avatar_url or not avatar_url.startswith(_AVATAR_URL_PREFIX):
+        return None
+    name = avatar_url[len(_AVATAR_URL_PREFIX):].partition("?")[0]
+    stem, _, ext = name.rpartition(".")
+    ext = ext.lower()
+    if stem != user_id or ext not in _ALLOWED_AVATAR_EXTENSIONS:
+        return None
+    return ext
+
+
+def _encode_avatar(stream) -> bytes:
+    """Downscale an uploaded image to at most 256x256 and re-encode as WebP.
+
+    JPEG draft mode lets libjpeg decode at a reduced scale instead of
+    decoding the full-size image and then shrinking it.
+    """
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with Image.open(stream) as img:
+            img.draft("RGB", _AVATAR_SIZE_PX)
+            img.thumbnail(_AVATAR_SIZE_PX)
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA")
+            out = io.BytesIO()
+            img.save(out, "WEBP", quality=85)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        raise ValidationError("avatar must be a valid image")
+    return out.getvalue()
+
+
 @bp.route("/upload-avatar", methods=["POST"])
 @login_required
 def upload_avatar():
     user_id = get_current_user_id()
+    # Reject on the declared length before reading the body, and cap what
+    # Werkzeug will read for this request (the app-wide limit is sized for
+    # document uploads).
+    request.max_content_length = _MAX_AVATAR_REQUEST_BYTES
+    if (request.content_length or 0) > _MAX_AVATAR_REQUEST_BYTES:
+        raise ValidationError("avatar must be 2MB or smaller")
     file = request.files.get("file")
     if not file or not file.filename:
         raise ValidationError("avatar file is required")
 
     safe_name = secure_filename(file.filename)
-    ext = Path(safe_name).suffix.lower().lstrip(".")
-    if ext not in _ALLOWED_AVATAR_EXTENSIONS:
+    _, dot, ext = safe_name.lower().rpartition(".")
+    if not dot or ext not in _ALLOWED_AVATAR_EXTENSIONS:
         raise ValidationError("avatar must be jpg, jpeg, png, gif, or webp")
 
-    file.stream.seek(0, 2)
-    size = file.stream.tell()
-    file.stream.seek(0)
-    if size > _MAX_AVATAR_SIZE_BYTES:
-        raise ValidationError("avatar must be 2MB or smaller")
-
-    _AVATAR_DIR.mkdir(parents=True, exist_ok=True)
-    for existing in _AVATAR_DIR.glob(f"{user_id}.*"):
-        try:
-            existing.unlink()
-        except OSError:
-            pass
+    avatar_bytes = _encode_avatar(file.stream)
 
-    filename = f"{user_id}.{ext}"
-    file.save(_AVATAR_DIR / filename)
-    avatar_url = f"/api/auth/avatar/{filename}"
+    filename = f"{user_id}.webp"
+    (_AVATAR_DIR / filename).write_bytes(avatar_bytes)
+    avatar_url = f"{_AVATAR_URL_PREFIX}{filename}?v={int(_utcnow().timestamp())}"
 
     with get_db() as db:
-        user = db.query(User).filter_by(id=user_id).first()
+        user = (
+            db.query(User)
+            .options(load_only(User.id, User.avatar_url))
+            .filter_by(id=user_id)
+            .first()
+        )
         if not user:
             raise UnauthorizedError("User not found")
+        previous_url = user.avatar_url
         user.avatar_url = avatar_url
         db.flush()
 
+    # Avatars are now always WebP; an upload from before that left a file
+    # in its original format, named by the previous avatar_url.
+    previous_ext = _uploaded_avatar_ext(previous_url, user_id)
+    if previous_ext and previous_ext != "webp":
+        try:
+            (_AVATAR_DIR / f"{user_id}.{previous_ext}").unlink(missing_ok=True)
+        except OSError:
+            pass
+
     return jsonify({"avatar_url": avatar_url})
 
 
 @bp.route("/avatar/<filename>", methods=["GET"])
 def get_avatar(filename: str):
-    if not _AVATAR_FILENAME_RE.match(filename):
+    # Stored names are "<user uuid>.<ext>": ASCII letters, digits and dashes.
+    stem, _, ext = filename.rpartition(".")
+    stem = stem.replace("-", "")
+    if not (
+        stem.isascii()
+        and stem.isalnum()
+        and ext.lower() in _ALLOWED_AVATAR_EXTENSIONS
+    ):
         raise ValidationError("Invalid avatar filename")
-    file_path = _AVATAR_DIR / filename
-    if not file_path.exists():
-        raise NotFoundError("Avatar not found")
-    return send_from_directory(str(_AVATAR_DIR), filename)
+    accel_prefix = config.AVATAR_ACCEL_REDIRECT_PREFIX
+    if accel_prefix:
+        # nginx serves the file (or its own 404) from its internal
+        # location; the worker only sends headers.
+        response = Response(mimetype=mimetypes.guess_type(filename)[0])
+        response.headers["X-Accel-Redirect"] = f"{accel_prefix.rstrip('/')}/{filename}"
+        response.cache_control.public = True
+        response.cache_control.max_age = _AVATAR_MAX_AGE_SECONDS
+    else:
+        # send_from_directory stats the file itself and answers
+        # If-None-Match / If-Modified-Since with a 304.
+        try:
+            response = send_from_directory(
+                str(_AVATAR_DIR), filename, max_age=_AVATAR_MAX_AGE_SECONDS
+            )
+        except NotFound:
+            raise NotFoundError("Avatar not found")
+    # Avatar URLs are versioned (?v=), so a given URL never changes content.
+    response.cache_control.immutable = True
+    return response
 
 
 @bp.route("/change-password", methods=["POST"])
 @login_required
 def change_password():
     user_id = get_current_user_id()
-    body = request.get_json(force=True)
+    body = json_body()
     current_password = body.get("current_password", "")
     new_password = body.get("new_password", "")
     if not current_password or not new_password:
         raise ValidationError("current_password and new_password are required")
     _validate_password(new_password)
 
+    _verify_current_password(user_id, current_password)
+    password_hash = hash_password(new_password)
     with get_db() as db:
-        user = db.query(User).filter_by(id=user_id).first()
-        if not user:
+        updated = db.query(User).filter_by(id=user_id).update(
+            {"password_hash": password_hash},
+            synchronize_session=False,
+        )
+        if not updated:
             raise UnauthorizedError("User not found")
-        if not _check_password(current_password, user.password_hash):
-            raise UnauthorizedError("Current password is incorrect")
-        user.password_hash = _hash_password(new_password)
-        logger.info("password_changed user=%s", user_id)
-        db.flush()
-        return jsonify({"status": "ok"})
+    logger.info("password_changed user=%s", user_id)
+    return jsonify({"status": "ok"})
 
 
 @bp.route("/send-verification", methods=["POST"])
@@ -427,14 +629,19 @@ def send_verification():
 @bp.route("/verify-email", methods=["POST"])
 @limiter.limit("3/minute")
 def verify_email():
-    body = request.get_json(force=True)
+    body = json_body()
     raw_token = (body.get("token") or "").strip()
     if not raw_token:
         raise ValidationError("token is required")
 
     with get_db() as db:
         token = _consume_account_token(db, raw_token, _TOKEN_VERIFY_EMAIL)
-        user = db.query(User).filter_by(id=token.user_id).first()
+        user = (
+            db.query(User)
+            .options(load_only(User.id, User.email_verified))
+            .filter_by(id=token.user_id)
+            .first()
+        )
         if not user:
             raise ValidationError("Invalid or expired token")
         user.email_verified = True
@@ -445,9 +652,9 @@ def verify_email():
 @bp.route("/forgot-password", methods=["POST"])
 @limiter.limit("5/minute")
 def forgot_password():
-    body = request.get_json(force=True)
+    body = json_body()
     email = _normalize_email(body.get("email", ""))
-    if not _EMAIL_RE.match(email):
+    if not _is_valid_email(email):
         # Anti-enumeration: always same response.
         return jsonify(
             {
@@ -479,19 +686,25 @@ def forgot_password():
 @bp.route("/reset-password", methods=["POST"])
 @limiter.limit("10/minute")
 def reset_password():
-    body = request.get_json(force=True)
+    body = json_body()
     raw_token = (body.get("token") or "").strip()
     new_password = body.get("new_password", "")
     if not raw_token or not new_password:
         raise ValidationError("token and new_password are required")
     _validate_password(new_password)
 
+    password_hash = hash_password(new_password)
     with get_db() as db:
         token = _consume_account_token(db, raw_token, _TOKEN_RESET_PASSWORD)
-        user = db.query(User).filter_by(id=token.user_id).first()
+        user = (
+            db.query(User)
+            .options(load_only(User.id, User.password_hash))
+            .filter_by(id=token.user_id)
+            .first()
+        )
         if not user:
             raise ValidationError("Invalid or expired token")
-        user.password_hash = _hash_password(new_password)
+        user.password_hash = password_hash
         db.flush()
         logger.info("password_reset user=%s", user.id)
     return jsonify({"status": "ok"})
@@ -501,21 +714,25 @@ def reset_password():
 @login_required
 def change_email():
     user_id = get_current_user_id()
-    body = request.get_json(force=True)
+    body = json_body()
     current_password = body.get("current_password", "")
     new_email = _normalize_email(body.get("new_email", ""))
     if not current_password or not new_email:
         raise ValidationError("current_password and new_email are required")
-    if not _EMAIL_RE.match(new_email):
+    if not _is_valid_email(new_email):
         raise ValidationError("Valid email is required")
 
+    _verify_current_password(user_id, current_password)
     with get_db() as db:
-        user = db.query(User).filter_by(id=user_id).first()
+        user = (
+            db.query(User)
+            .options(load_only(User.id, User.email))
+            .filter_by(id=user_id)
+            .first()
+        )
         if not user:
             raise UnauthorizedError("User not found")
-        if not _check_password(current_password, user.password_hash):
-            raise UnauthorizedError("Current password is incorrect")
-        if db.query(User).filter(User.email == new_email, User.id != user_id).first():
+        if _email_taken(db, new_email, exclude_user_id=user_id):
             raise ValidationError("An account with that email already exists")
         token = _issue_account_token(
             db,
@@ -530,7 +747,7 @@ def change_email():
 @bp.route("/confirm-email-change", methods=["POST"])
 @limiter.limit("10/minute")
 def confirm_email_change():
-    body = request.get_json(force=True)
+    body = json_body()
     raw_token = (body.get("token") or "").strip()
     if not raw_token:
         raise ValidationError("token is required")
@@ -539,13 +756,15 @@ def confirm_email_change():
         token = _consume_account_token(db, raw_token, _TOKEN_CHANGE_EMAIL)
         if not token.new_email:
             raise ValidationError("Invalid or expired token")
-        user = db.query(User).filter_by(id=token.user_id).first()
+        user = (
+            db.query(User)
+            .options(load_only(User.id, User.email, User.email_verified))
+            .filter_by(id=token.user_id)
+            .first()
+        )
         if not user:
             raise ValidationError("Invalid or expired token")
-        if db.query(User).filter(
-            User.email == token.new_email,
-            User.id != user.id,
-        ).first():
+        if _email_taken(db, token.new_email, exclude_user_id=user.id):
             raise ValidationError("An account with that email already exists")
         user.email = _normalize_email(token.new_email)
         user.email_verified = True
@@ -557,20 +776,20 @@ def confirm_email_change():
 @login_required
 def delete_account():
     user_id = get_current_user_id()
-    body = request.get_json(force=True)
+    body = json_body()
     current_password = body.get("current_password", "")
     if not current_password:
         raise ValidationError("current_password is required")
 
+    _verify_current_password(user_id, current_password)
     try:
         with get_db() as db:
             user = db.query(User).filter_by(id=user_id).first()
             if not user:
                 raise UnauthorizedError("User not found")
-            if not _check_password(current_password, user.password_hash):
-                raise UnauthorizedError("Current password is incorrect")
             delete_user_account(db, user)
     except APIError:
         raise
+    invalidate_cached_user(user_id)
 
     return jsonify({"status": "ok"})
@@ -1,46 +1,70 @@
 """AutoTeach routes — intelligent study orchestration."""
 
-import json
-import os
 import re
 import time
 
+import orjson
 from flask import Blueprint, request, jsonify, Response
+from sqlalchemy import exists, func, select
 
 from api.errors import ValidationError, NotFoundError
 from api.middleware.auth import get_current_user, get_current_user_id, login_required
-from api.services.auto_teach import generate_teaching_plan, get_next_topic
+from api.middleware.request_body import json_body
+from api.models.exam_blueprint import ExamTopicWeight
+from api.models.student import TopicMastery
+from api.services.auto_teach import (
+    TeachingTarget,
+    _build_opening_message,
+    generate_teaching_plan,
+    get_next_topic,
+    select_teaching_mode,
+)
 from api.services.exam_analyzer import analyze_exam, get_exam_blueprints
-from api.services import tutor_engine
+from api.services import debug_log, tutor_engine
 from api.services.database import get_db
-from api.services.tier_limits import check_tier_limit
+from api.services.tier_limits import check_tier_limit, invalidate_tier_status
 
-_PERF_TAG_RE = re.compile(r"<performance>[\s\S]*?</performance>")
-_PRACTICE_TAG_RE = re.compile(r"<practice_questions>[\s\S]*?</practice_questions>")
-_DEBUG_LOG_PATH = r"c:\Dev\LawFlow\.claude\worktrees\charming-dewdney\.cursor\debug.log"
+# Metadata blocks the tutor appends for the backend; never streamed to the
+# client. _META_OPEN_RE finds one still waiting for its closing tag.
+_META_TAG_RE = re.compile(
+    r"<(performance|practice_questions)\b[^>]*>.*?</\1>", re.DOTALL
+)
+_META_OPEN_RE = re.compile(r"<(?:performance|practice_questions)\b")
+_META_OPENERS = ("<performance", "<practice_questions")
+
+
+def _split_meta_stream(text: str) -> tuple[str, str]:
+    """Split streamed text into (safe to emit, hold for the next chunk).
+
+    Complete metadata blocks are assumed already removed. Holds from an
+    unclosed opening tag, or from a trailing "<..." that could still grow
+    into one once the next chunk arrives.
+    """
+    open_tag = _META_OPEN_RE.search(text)
+    if open_tag:
+        return text[:open_tag.start()], text[open_tag.start():]
+    lt = text.rfind("<")
+    if lt != -1 and any(o.startswith(text[lt:]) for o in _META_OPENERS):
+        return text[:lt], text[lt:]
+    return text, ""
 
 
 def _debug_log(hypothesis_id: str, message: str, data: dict):
     # #region agent log
-    try:
-        os.makedirs(os.path.dirname(_DEBUG_LOG_PATH), exist_ok=True)
-        with open(_DEBUG_LOG_PATH, "a", encoding="utf-8") as f:
-            f.write(
-                json.dumps(
-                    {
-                        "id": f"log_{int(time.time() * 1000)}_auto_teach_route",
-                        "timestamp": int(time.time() * 1000),
-                        "runId": "pre-fix",
-                        "hypothesisId": hypothesis_id,
-                        "location": "api/routes/auto_teach.py:start_auto_session",
-                        "message": message,
-                        "data": data,
-                    }
-                )
-                + "\n"
-            )
-    except Exception:
-        pass
+    if not debug_log.ENABLED:
+        return
+    now_ms = int(time.time() * 1000)
+    debug_log.emit(
+        {
+            "id": f"log_{now_ms}_auto_teach_route",
+            "timestamp": now_ms,
+            "runId": "pre-fix",
+            "hypothesisId": hypothesis_id,
+            "location": "api/routes/auto_teach.py:start_auto_session",
+            "message": message,
+            "data": data,
+        }
+    )
     # #endregion
 
 bp = Blueprint("auto_teach", __name__, url_prefix="/api/auto-teach")
@@ -94,7 +118,7 @@ def start_auto_session():
     }
     """
     user_id = get_current_user_id()
-    data = request.get_json()
+    data = json_body()
     if not data or "subject" not in data:
         raise ValidationError("subject is required")
 
@@ -130,31 +154,41 @@ def start_auto_session():
         mode = next_t["recommended_mode"]
         opening = auto_session["opening_message"]
     else:
-        from api.services.auto_teach import select_teaching_mode, _build_opening_message
-        from api.models.student import TopicMastery
-        from api.services.exam_analyzer import get_aggregated_topic_weights
-
+        # One round trip: the topic's mastery row, its average exam weight
+        # and whether the subject has any exam data at all, each answered
+        # from the (user_id, subject, topic) indexes.
+        tm_where = (
+            TopicMastery.user_id == user_id,
+            TopicMastery.subject == subject,
+            TopicMastery.topic == topic,
+        )
+        etw_where = (
+            ExamTopicWeight.user_id == user_id,
+            ExamTopicWeight.subject == subject,
+        )
         with get_db() as db:
-            t = db.query(TopicMastery).filter_by(
-                user_id=user_id,
-                subject=subject,
-                topic=topic,
-            ).first()
-            mastery = t.mastery_score if t else 0.0
-            display = t.display_name if t else topic
-
-        exam_weights = get_aggregated_topic_weights(subject, user_id=user_id)
-        has_exam_data = bool(exam_weights)
+            mastery, display, exam_weight, has_exam_data = db.execute(
+                select(
+                    select(TopicMastery.mastery_score).where(*tm_where).scalar_subquery(),
+                    select(TopicMastery.display_name).where(*tm_where).scalar_subquery(),
+                    select(func.avg(ExamTopicWeight.weight))
+                    .where(*etw_where, ExamTopicWeight.topic == topic)
+                    .scalar_subquery(),
+                    exists().where(*etw_where),
+                )
+            ).one()
+        if mastery is None:
+            mastery = 0.0
+        display = display or topic
         mode, mode_reason = select_teaching_mode(mastery, has_exam_data)
 
-        from api.services.auto_teach import TeachingTarget
         target = TeachingTarget(
             subject=subject,
             topic=topic,
             display_name=display,
             priority_score=0,
             mastery=mastery,
-            exam_weight=exam_weights.get(topic, 0),
+            exam_weight=exam_weight or 0,
             recommended_mode=mode,
             mode_reason=mode_reason,
             knowledge_chunks_available=0,
@@ -163,7 +197,7 @@ def start_auto_session():
         opening = _build_opening_message(target, has_exam_data, available_minutes)
 
     with get_db() as db:
-        check_tier_limit(db, get_current_user(), "auto_teach_sessions_daily")
+        check_tier_limit(db, get_current_user(db=db), "auto_teach_sessions_daily")
 
     # Create the session
     session = tutor_engine.create_session(
@@ -174,36 +208,29 @@ def start_auto_session():
         session_type="auto_teach",
         user_id=user_id,
     )
+    invalidate_tier_status(user_id)
 
     # Stream the opening response, filtering <performance> metadata
     def generate():
-        perf_buf = ""
+        held = ""
         try:
             for chunk in tutor_engine.send_message(
                 session["id"],
                 opening,
                 user_id=user_id,
             ):
-                text = perf_buf + chunk
-                perf_buf = ""
-
-                # Buffer incomplete metadata tags until they close
-                for tag_name in ("performance", "practice_questions"):
-                    tag_start = text.find(f"<{tag_name}")
-                    if tag_start != -1:
-                        tag_end = text.find(f"</{tag_name}>")
-                        if tag_end != -1:
-                            text = text[:tag_start] + text[tag_end + len(f"</{tag_name}>"):]
-                        else:
-                            perf_buf = text[tag_start:]
-                            text = text[:tag_start]
-
-                # Strip any fully-formed tags that span multiple chunks
-                text = _PERF_TAG_RE.sub("", text)
-                text = _PRACTICE_TAG_RE.sub("", text)
+                text = held + chunk
+                held = ""
+                # Held text always starts with "<", so prose-only chunks
+                # skip both regex scans.
+                if "<" in text:
+                    text, held = _split_meta_stream(_META_TAG_RE.sub("", text))
                 if text:
-                    yield f"data: {json.dumps(text)}\n\n"
-            yield "data: [DONE]\n\n"
+                    yield b"data: " + orjson.dumps(text) + b"\n\n"
+            # A trailing "<..." that never became a metadata tag is text.
+            if held and not _META_OPEN_RE.match(held):
+                yield b"data: " + orjson.dumps(held) + b"\n\n"
+            yield b"data: [DONE]\n\n"
         except Exception as e:
             # #region agent log
             _debug_log(
@@ -215,7 +242,7 @@ def start_auto_session():
                 },
             )
             # #endregion
-            yield f"data: [ERROR][DBGv2] {str(e)}\n\n"
+            yield f"data: [ERROR][DBGv2] {e}\n\n".encode()
 
     # Return session info + streaming response
     # We use a special header so the frontend knows the session ID
@@ -8,10 +8,40 @@ from api.errors import NotFoundError, ValidationError
 from api.middleware.auth import get_current_user_id, login_required
 from api.models.user import User
 from api.services.database import get_db
-from api.services.tier_limits import get_tier_status
+from api.services.tier_limits import (
+    cache_tier_status,
+    get_cached_tier_status,
+    get_tier_status,
+    invalidate_tier_status,
+)
 
 bp = Blueprint("billing", __name__, url_prefix="/api/billing")
 
+_SUBSCRIPTION_EVENTS = frozenset({
+    "checkout.session.completed",
+    "customer.subscription.created",
+    "customer.subscription.updated",
+    "customer.subscription.deleted",
+})
+
+
+def _find_billing_user(db, customer_id: str | None, user_id: str | None):
+    """Resolve the user a Stripe object belongs to.
+
+    Customers created by Checkout aren't stored until their first
+    checkout.session.completed, so events can arrive before the customer id
+    is known; fall back to the user id the app attached when it made them,
+    and remember the customer id for later events.
+    """
+    user = None
+    if customer_id:
+        user = db.query(User).filter_by(stripe_customer_id=customer_id).first()
+    if user is None and user_id:
+        user = db.query(User).filter_by(id=user_id).first()
+        if user is not None and customer_id and not user.stripe_customer_id:
+            user.stripe_customer_id = customer_id
+    return user
+
 
 def _stripe_enabled() -> bool:
     return bool(config.STRIPE_SECRET_KEY and config.STRIPE_PRO_PRICE_ID)
@@ -27,11 +57,15 @@ def _setup_stripe() -> None:
 @login_required
 def billing_status():
     user_id = get_current_user_id()
-    with get_db() as db:
-        user = db.query(User).filter_by(id=user_id).first()
-        if not user:
-            raise NotFoundError("User not found")
-        return jsonify(get_tier_status(db, user))
+    status = get_cached_tier_status(user_id)
+    if status is None:
+        with get_db() as db:
+            user = db.query(User).filter_by(id=user_id).first()
+            if not user:
+                raise NotFoundError("User not found")
+            status = get_tier_status(db, user)
+        cache_tier_status(user_id, status)
+    return jsonify(status)
 
 
 @bp.route("/create-checkout", methods=["POST"])
@@ -41,31 +75,34 @@ def create_checkout():
     user_id = get_current_user_id()
 
     with get_db() as db:
-        user = db.query(User).filter_by(id=user_id).first()
-        if not user:
-            raise NotFoundError("User not found")
-
-        customer_id = user.stripe_customer_id
-        if not customer_id:
-            customer = stripe.Customer.create(
-                email=user.email,
-                name=user.display_name,
-                metadata={"user_id": user.id},
-            )
-            customer_id = customer["id"]
-            user.stripe_customer_id = customer_id
-            db.flush()
-
-        checkout = stripe.checkout.Session.create(
-            mode="subscription",
-            customer=customer_id,
-            line_items=[{"price": config.STRIPE_PRO_PRICE_ID, "quantity": 1}],
-            success_url=f"{config.APP_BASE_URL}/pricing?checkout=success",
-            cancel_url=f"{config.APP_BASE_URL}/pricing?checkout=cancel",
-            allow_promotion_codes=True,
-            metadata={"user_id": user.id},
+        row = (
+            db.query(User.email, User.stripe_customer_id)
+            .filter_by(id=user_id)
+            .first()
         )
-        return jsonify({"url": checkout["url"], "session_id": checkout["id"]})
+    if not row:
+        raise NotFoundError("User not found")
+
+    # First-time subscribers get their Stripe customer created by Checkout
+    # itself, saving a Customer.create round trip; the webhook links it
+    # back to the user through client_reference_id.
+    if row.stripe_customer_id:
+        customer_args = {"customer": row.stripe_customer_id}
+    else:
+        customer_args = {"customer_email": row.email}
+
+    checkout = stripe.checkout.Session.create(
+        mode="subscription",
+        **customer_args,
+        client_reference_id=user_id,
+        line_items=[{"price": config.STRIPE_PRO_PRICE_ID, "quantity": 1}],
+        success_url=f"{config.APP_BASE_URL}/pricing?checkout=success",
+        cancel_url=f"{config.APP_BASE_URL}/pricing?checkout=cancel",
+        allow_promotion_codes=True,
+        metadata={"user_id": user_id},
+        subscription_data={"metadata": {"user_id": user_id}},
+    )
+    return jsonify({"url": checkout["url"], "session_id": checkout["id"]})
 
 
 @bp.route("/create-portal", methods=["POST"])
@@ -108,32 +145,32 @@ def webhook():
     event_type = event.get("type")
     data_object = event.get("data", {}).get("object", {})
 
+    if event_type not in _SUBSCRIPTION_EVENTS:
+        return jsonify({"received": True})
+
+    metadata = data_object.get("metadata") or {}
     with get_db() as db:
+        # Only Checkout sessions carry client_reference_id; subscriptions
+        # fall back to their metadata.
+        user = _find_billing_user(
+            db,
+            data_object.get("customer"),
+            data_object.get("client_reference_id") or metadata.get("user_id"),
+        )
+        if user is None:
+            return jsonify({"received": True})
         if event_type == "checkout.session.completed":
-            customer_id = data_object.get("customer")
-            subscription_id = data_object.get("subscription")
-            if customer_id:
-                user = db.query(User).filter_by(stripe_customer_id=customer_id).first()
-                if user:
-                    user.stripe_subscription_id = subscription_id
-                    user.subscription_status = "active"
-                    user.tier = "pro"
-        elif event_type in {"customer.subscription.created", "customer.subscription.updated"}:
-            customer_id = data_object.get("customer")
-            status = data_object.get("status") or "none"
-            subscription_id = data_object.get("id")
-            if customer_id:
-                user = db.query(User).filter_by(stripe_customer_id=customer_id).first()
-                if user:
-                    user.stripe_subscription_id = subscription_id
-                    user.subscription_status = status
-                    user.tier = "pro" if status in {"active", "trialing"} else "free"
+            user.stripe_subscription_id = data_object.get("subscription")
+            user.subscription_status = "active"
+            user.tier = "pro"
         elif event_type == "customer.subscription.deleted":
-            customer_id = data_object.get("customer")
-            if customer_id:
-                user = db.query(User).filter_by(stripe_customer_id=customer_id).first()
-                if user:
-                    user.subscription_status = "canceled"
-                    user.tier = "free"
+            user.subscription_status = "canceled"
+            user.tier = "free"
+        else:
+            status = data_object.get("status") or "none"
+            user.stripe_subscription_id = data_object.get("id")
+            user.subscription_status = status
+            user.tier = "pro" if status in {"active", "trialing"} else "free"
 
+    invalidate_tier_status(user.id)
     return jsonify({"received": True})
@@ -1,21 +1,23 @@
 """Document upload and management routes."""
 
+import contextlib
 import os
-import uuid
-import threading
+import tempfile
 from pathlib import Path
 
 from flask import Blueprint, request, jsonify, send_file
+from sqlalchemy.orm import raiseload
+from werkzeug.formparser import parse_form_data
 
 from api.config import config
 from api.errors import ValidationError, NotFoundError
 from api.middleware.auth import get_current_user, get_current_user_id, login_required
 from api.services.database import get_db
+from api.models.base import new_uuid7
 from api.models.document import Document, KnowledgeChunk
-from api.services.document_processor import extract_document, chunk_sections
-from api.services.knowledge_builder import tag_chunks_batch
 from api.services.document_converter import convert_document
-from api.services.tier_limits import check_tier_limit
+from api.services import document_jobs
+from api.services.tier_limits import check_tier_limit, invalidate_tier_status
 
 bp = Blueprint("documents", __name__, url_prefix="/api/documents")
 
@@ -36,35 +38,60 @@ def _allowed_file(filename: str) -> bool:
 def upload_document():
     """Upload a document for processing."""
     user_id = get_current_user_id()
+    max_bytes = config.MAX_UPLOAD_MB * 1024 * 1024
+    if (request.content_length or 0) > max_bytes:
+        raise ValidationError(f"File too large. Max: {config.MAX_UPLOAD_MB}MB")
 
-    if "file" not in request.files:
-        raise ValidationError("No file provided")
+    # File parts are written straight into UPLOAD_DIR as they are parsed,
+    # instead of into Werkzeug's SpooledTemporaryFile and then copied; the
+    # accepted one is renamed into place, any others are removed.
+    os.makedirs(config.UPLOAD_DIR, exist_ok=True)
+    part_paths: list[str] = []
 
-    file = request.files["file"]
-    if not file.filename or not _allowed_file(file.filename):
-        raise ValidationError(f"Invalid file type. Allowed: {', '.join(ALLOWED_EXTENSIONS)}")
+    def _stream_factory(total_content_length, content_type, filename, content_length=None):
+        part = tempfile.NamedTemporaryFile(
+            dir=config.UPLOAD_DIR, prefix="upload-", suffix=".part", delete=False
+        )
+        part_paths.append(part.name)
+        return part
 
-    # Check file size
-    file.seek(0, 2)
-    size = file.tell()
-    file.seek(0)
-    if size > config.MAX_UPLOAD_MB * 1024 * 1024:
-        raise ValidationError(f"File too large. Max: {config.MAX_UPLOAD_MB}MB")
+    try:
+        _, form, files = parse_form_data(
+            request.environ,
+            stream_factory=_stream_factory,
+            max_form_memory_size=request.max_form_memory_size,
+            max_content_length=request.max_content_length,
+            max_form_parts=request.max_form_parts,
+        )
+        for part in files.values():
+            part.stream.close()
 
-    # Save file
-    ext = file.filename.rsplit(".", 1)[1].lower()
-    doc_id = str(uuid.uuid4())
-    filename = f"{doc_id}.{ext}"
-    os.makedirs(config.UPLOAD_DIR, exist_ok=True)
-    file_path = os.path.join(config.UPLOAD_DIR, filename)
-    file.save(file_path)
+        if "file" not in files:
+            raise ValidationError("No file provided")
+
+        file = files["file"]
+        if not file.filename or not _allowed_file(file.filename):
+            raise ValidationError(f"Invalid file type. Allowed: {', '.join(ALLOWED_EXTENSIONS)}")
+
+        size = os.path.getsize(file.stream.name)
+        if size > max_bytes:
+            raise ValidationError(f"File too large. Max: {config.MAX_UPLOAD_MB}MB")
+
+        ext = file.filename.rsplit(".", 1)[1].lower()
+        doc_id = new_uuid7()
+        file_path = os.path.join(config.UPLOAD_DIR, f"{doc_id}.{ext}")
+        os.replace(file.stream.name, file_path)
+    finally:
+        for path in part_paths:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
 
     # Create document record
-    subject = request.form.get("subject")
-    doc_type = request.form.get("doc_type")
+    subject = form.get("subject")
+    doc_type = form.get("doc_type")
 
     with get_db() as db:
-        check_tier_limit(db, get_current_user(), "document_uploads_total")
+        check_tier_limit(db, get_current_user(db=db), "document_uploads_total")
         doc = Document(
             id=doc_id,
             user_id=user_id,
@@ -77,68 +104,13 @@ def upload_document():
             processing_status="pending",
         )
         db.add(doc)
+    invalidate_tier_status(user_id)
 
-    # Process in background thread
-    thread = threading.Thread(target=_process_document, args=(doc_id, user_id))
-    thread.daemon = True
-    thread.start()
+    document_jobs.submit(document_jobs.process_document, doc_id, user_id)
 
     return jsonify({"id": doc_id, "status": "pending", "filename": file.filename}), 201
 
 
-def _process_document(doc_id: str, user_id: str):
-    """Background processing: extract text, chunk, tag with Claude."""
-    try:
-        with get_db() as db:
-            doc = db.query(Document).filter_by(id=doc_id, user_id=user_id).first()
-            if not doc:
-                return
-            doc.processing_status = "processing"
-            file_path = doc.file_path
-            subject = doc.subject
-
-        # Extract text
-        sections = extract_document(file_path)
-        chunks = chunk_sections(sections)
-
-        # Prepare for tagging
-        chunk_dicts = [{"content": c.content, "heading": c.heading} for c in chunks]
-
-        # Tag with Claude (this is the expensive step)
-        tagged = tag_chunks_batch(chunk_dicts)
-
-        # Save to database
-        with get_db() as db:
-            for i, t in enumerate(tagged):
-                kc = KnowledgeChunk(
-                    user_id=user_id,
-                    document_id=doc_id,
-                    content=t["content"],
-                    summary=t.get("summary"),
-                    chunk_index=i,
-                    subject=t.get("subject", subject or "other"),
-                    topic=t.get("topic"),
-                    subtopic=t.get("subtopic"),
-                    difficulty=t.get("difficulty", 50),
-                    content_type=t.get("content_type", "concept"),
-                    case_name=t.get("case_name"),
-                    key_terms=t.get("key_terms", "[]"),
-                )
-                db.add(kc)
-
-            doc = db.query(Document).filter_by(id=doc_id, user_id=user_id).first()
-            if doc:
-                doc.processing_status = "completed"
-                doc.total_chunks = len(tagged)
-
-    except Exception as e:
-        with get_db() as db:
-            doc = db.query(Document).filter_by(id=doc_id, user_id=user_id).first()
-            if doc:
-                doc.processing_status = "error"
-                doc.error_message = str(e)
-
-
 @bp.route("", methods=["GET"])
 def list_documents():
     """List all documents."""
@@ -146,6 +118,7 @@ def list_documents():
     with get_db() as db:
         query = (
             db.query(Document)
+            .options(raiseload(Document.chunks))
             .filter_by(user_id=user_id)
             .order_by(Document.created_at.desc())
         )
@@ -171,7 +144,13 @@ def get_document(doc_id: str):
         if not doc:
             raise NotFoundError("Document not found")
         data = doc.to_dict()
-        data["chunks"] = [c.to_dict() for c in doc.chunks]
+        rows = (
+            db.query(*KnowledgeChunk.columns_for_dict())
+            .filter(KnowledgeChunk.document_id == doc.id)
+            .order_by(KnowledgeChunk.chunk_index)
+            .all()
+        )
+        data["chunks"] = [KnowledgeChunk.dict_from_row(r) for r in rows]
         return jsonify(data)
 
 
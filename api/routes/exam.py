@@ -12,7 +12,7 @@ from api.services.exam_simulator import (
     get_exam_results,
     get_exam_history,
 )
-from api.services.tier_limits import check_tier_limit
+from api.services.tier_limits import check_tier_limit, invalidate_tier_status
 
 bp = Blueprint("exam", __name__, url_prefix="/api/exam")
 
@@ -49,7 +49,7 @@ def create_exam():
 
     try:
         with get_db() as db:
-            check_tier_limit(db, get_current_user(), "exam_generations_daily")
+            check_tier_limit(db, get_current_user(db=db), "exam_generations_daily")
         exam = generate_exam(
             subject=subject,
             exam_format=exam_format,
@@ -59,6 +59,7 @@ def create_exam():
         )
     except (ValueError, RuntimeError) as e:
         raise ValidationError(str(e))
+    invalidate_tier_status(user_id)
 
     return jsonify(exam)
 
@@ -26,7 +26,10 @@ def search():
 
     user_id = get_current_user_id()
     with get_db() as db:
-        query = db.query(KnowledgeChunk).filter(KnowledgeChunk.user_id == user_id)
+        # Read-only listing: select plain columns instead of ORM instances.
+        query = db.query(*KnowledgeChunk.columns_for_dict()).filter(
+            KnowledgeChunk.user_id == user_id
+        )
 
         if subject:
             query = query.filter(KnowledgeChunk.subject == subject)
@@ -37,8 +40,8 @@ def search():
         if q:
             query = query.filter(KnowledgeChunk.content.ilike(f"%{q}%"))
 
-        chunks = query.limit(limit).all()
-        return jsonify([c.to_dict() for c in chunks])
+        rows = query.limit(limit).all()
+        return jsonify([KnowledgeChunk.dict_from_row(r) for r in rows])
 
 
 @bp.route("/subjects", methods=["GET"])
@@ -1,6 +1,7 @@
 """Profile and settings routes."""
 
 from flask import Blueprint, jsonify
+from sqlalchemy import delete, func, select, text
 
 from api.middleware.auth import get_current_user_id, login_required
 from api.services.database import get_db
@@ -25,28 +26,45 @@ def require_auth():
     return None
 
 
+def _count(model, user_id: str):
+    return (
+        select(func.count()).select_from(model)
+        .where(model.user_id == user_id).scalar_subquery()
+    )
+
+
 @bp.route("/stats", methods=["GET"])
 def profile_stats():
     """Aggregate stats for the profile page."""
     user_id = get_current_user_id()
+    sm_where = SubjectMastery.user_id == user_id
+    # One round trip for every count and aggregate.
     with get_db() as db:
-        # Count records across all tables
-        total_subjects = db.query(SubjectMastery).filter_by(user_id=user_id).count()
-        total_topics = db.query(TopicMastery).filter_by(user_id=user_id).count()
-        total_sessions = db.query(StudySession).filter_by(user_id=user_id).count()
-        total_assessments = db.query(Assessment).filter_by(user_id=user_id).count()
-        total_documents = db.query(Document).filter_by(user_id=user_id).count()
-        total_flashcards = db.query(SpacedRepetitionCard).filter_by(user_id=user_id).count()
-        user = db.query(User).filter_by(id=user_id).first()
-        
-        # Calculate overall mastery and study hours
-        subjects = db.query(SubjectMastery).filter_by(user_id=user_id).all()
-        overall_mastery = (
-            sum(s.mastery_score for s in subjects) / len(subjects)
-            if subjects else 0
-        )
-        total_study_hours = sum(s.total_study_time_minutes or 0 for s in subjects) / 60.0
-        
+        (
+            total_subjects,
+            overall_mastery,
+            total_study_minutes,
+            total_topics,
+            total_sessions,
+            total_assessments,
+            total_documents,
+            total_flashcards,
+            tier,
+        ) = db.query(
+            _count(SubjectMastery, user_id),
+            select(func.avg(SubjectMastery.mastery_score)).where(sm_where).scalar_subquery(),
+            select(func.sum(SubjectMastery.total_study_time_minutes))
+            .where(sm_where).scalar_subquery(),
+            _count(TopicMastery, user_id),
+            _count(StudySession, user_id),
+            _count(Assessment, user_id),
+            _count(Document, user_id),
+            _count(SpacedRepetitionCard, user_id),
+            select(User.tier).where(User.id == user_id).scalar_subquery(),
+        ).one()
+        overall_mastery = float(overall_mastery or 0)
+        total_study_hours = (total_study_minutes or 0) / 60.0
+
         return jsonify({
             "total_subjects": total_subjects,
             "total_topics": total_topics,
@@ -56,30 +74,61 @@ def profile_stats():
             "total_assessments": total_assessments,
             "total_documents": total_documents,
             "total_flashcards": total_flashcards,
-            "tier": (user.tier if user else "free"),
+            "tier": tier or "free",
         })
 
 
+# Study data cleared by reset-progress, children before parents.
+# Documents and knowledge chunks are kept.
+_PROGRESS_MODELS: tuple[type, ...] = (
+    ExamTopicWeight,
+    ExamBlueprint,
+    PlanTask,
+    StudyPlan,
+    SpacedRepetitionCard,
+    AssessmentQuestion,
+    Assessment,
+    SessionMessage,
+    StudySession,
+    TopicMastery,
+    SubjectMastery,
+    PointLedger,
+    Achievement,
+    RewardsProfile,
+)
+# reset-all also drops documents; their chunks go with them by FK cascade.
+_ALL_MODELS: tuple[type, ...] = _PROGRESS_MODELS + (Document,)
+
+
+def _delete_batch_sql(models: tuple[type, ...]):
+    return text(
+        ";\n".join(
+            f"DELETE FROM {model.__tablename__} WHERE user_id = :uid" for model in models
+        )
+    )
+
+
+_RESET_PROGRESS_PG_SQL = _delete_batch_sql(_PROGRESS_MODELS)
+_RESET_ALL_PG_SQL = _delete_batch_sql(_ALL_MODELS)
+
+
+def _delete_user_rows(db, user_id: str, models: tuple[type, ...], pg_sql) -> None:
+    """Delete the user's rows from each model's table in one transaction."""
+    if db.get_bind().dialect.name == "postgresql":
+        # One round trip: psycopg2 sends the joined statements as a batch.
+        db.execute(pg_sql, {"uid": user_id})
+        return
+    # Core DELETEs skip the ORM's identity-map synchronisation.
+    for model in models:
+        db.execute(delete(model).where(model.user_id == user_id))
+
+
 @bp.route("/reset-progress", methods=["POST"])
 def reset_progress():
     """Reset mastery and study data only (keeps uploaded documents and knowledge chunks)."""
     user_id = get_current_user_id()
     with get_db() as db:
-        # Delete study-related data but keep documents and knowledge
-        db.query(ExamTopicWeight).filter_by(user_id=user_id).delete()
-        db.query(ExamBlueprint).filter_by(user_id=user_id).delete()
-        db.query(PlanTask).filter_by(user_id=user_id).delete()
-        db.query(StudyPlan).filter_by(user_id=user_id).delete()
-        db.query(SpacedRepetitionCard).filter_by(user_id=user_id).delete()
-        db.query(AssessmentQuestion).filter_by(user_id=user_id).delete()
-        db.query(Assessment).filter_by(user_id=user_id).delete()
-        db.query(SessionMessage).filter_by(user_id=user_id).delete()
-        db.query(StudySession).filter_by(user_id=user_id).delete()
-        db.query(TopicMastery).filter_by(user_id=user_id).delete()
-        db.query(SubjectMastery).filter_by(user_id=user_id).delete()
-        db.query(PointLedger).filter_by(user_id=user_id).delete()
-        db.query(Achievement).filter_by(user_id=user_id).delete()
-        db.query(RewardsProfile).filter_by(user_id=user_id).delete()
+        _delete_user_rows(db, user_id, _PROGRESS_MODELS, _RESET_PROGRESS_PG_SQL)
     seed_subject_taxonomy(user_id=user_id)
     seed_achievements(user_id=user_id)
     return jsonify({"status": "ok"})
@@ -90,21 +139,7 @@ def reset_all():
     """Delete all data owned by the current user."""
     user_id = get_current_user_id()
     with get_db() as db:
-        db.query(ExamTopicWeight).filter_by(user_id=user_id).delete()
-        db.query(ExamBlueprint).filter_by(user_id=user_id).delete()
-        db.query(PlanTask).filter_by(user_id=user_id).delete()
-        db.query(StudyPlan).filter_by(user_id=user_id).delete()
-        db.query(SpacedRepetitionCard).filter_by(user_id=user_id).delete()
-        db.query(AssessmentQuestion).filter_by(user_id=user_id).delete()
-        db.query(Assessment).filter_by(user_id=user_id).delete()
-        db.query(SessionMessage).filter_by(user_id=user_id).delete()
-        db.query(StudySession).filter_by(user_id=user_id).delete()
-        db.query(TopicMastery).filter_by(user_id=user_id).delete()
-        db.query(SubjectMastery).filter_by(user_id=user_id).delete()
-        db.query(Document).filter_by(user_id=user_id).delete()
-        db.query(PointLedger).filter_by(user_id=user_id).delete()
-        db.query(Achievement).filter_by(user_id=user_id).delete()
-        db.query(RewardsProfile).filter_by(user_id=user_id).delete()
+        _delete_user_rows(db, user_id, _ALL_MODELS, _RESET_ALL_PG_SQL)
     seed_subject_taxonomy(user_id=user_id)
     seed_achievements(user_id=user_id)
-    return jsonify({"status": "ok"})
\ No newline at end of file
+    return jsonify({"status": "ok"})
@@ -3,6 +3,7 @@
 from datetime import datetime, timezone, timedelta
 
 from flask import Blueprint, jsonify, request
+from sqlalchemy import Date, func, select
 
 from api.middleware.auth import get_current_user_id, login_required
 from api.services.database import get_db
@@ -30,13 +31,27 @@ def dashboard():
             .order_by(SubjectMastery.display_name)
             .all()
         )
-        total_chunks = db.query(KnowledgeChunk).filter_by(user_id=user_id).count()
-        total_sessions = db.query(StudySession).filter_by(user_id=user_id).count()
+        total_chunks, total_sessions = db.query(
+            select(func.count()).select_from(KnowledgeChunk)
+            .where(KnowledgeChunk.user_id == user_id).scalar_subquery(),
+            select(func.count()).select_from(StudySession)
+            .where(StudySession.user_id == user_id).scalar_subquery(),
+        ).one()
         total_study_minutes = sum(s.total_study_time_minutes or 0 for s in subjects)
 
+        # All topics in one query, bucketed by subject, instead of a query
+        # per subject.
+        topics_by_subject: dict[str, list] = {}
+        for t in (
+            db.query(TopicMastery)
+            .filter_by(user_id=user_id)
+            .order_by(TopicMastery.subject, TopicMastery.topic)
+        ):
+            topics_by_subject.setdefault(t.subject, []).append(t)
+
         subject_data = []
         for s in subjects:
-            topics = db.query(TopicMastery).filter_by(user_id=user_id, subject=s.subject).all()
+            topics = topics_by_subject.get(s.subject, [])
             subject_data.append({
                 **s.to_dict(),
                 "topic_count": len(topics),
@@ -119,85 +134,77 @@ def study_history():
     cutoff = now - timedelta(days=days)
 
     user_id = get_current_user_id()
+    # Aggregate by date (UTC) in the database; one row per study day.
+    study_day = func.date(StudySession.started_at, type_=Date)
     with get_db() as db:
-        sessions = (
-            db.query(StudySession)
+        rows = (
+            db.query(
+                study_day,
+                func.coalesce(func.sum(StudySession.duration_minutes), 0),
+                func.count(),
+            )
             .filter(StudySession.user_id == user_id)
             .filter(StudySession.started_at >= cutoff)
-            .order_by(StudySession.started_at)
+            .group_by(study_day)
             .all()
         )
+    daily = {
+        day.isoformat(): {"date": day.isoformat(), "minutes": minutes, "sessions": count}
+        for day, minutes, count in rows
+    }
 
-        # Aggregate by date (UTC)
-        daily: dict[str, dict] = {}
-        for session in sessions:
-            day = session.started_at.strftime("%Y-%m-%d")
-            if day not in daily:
-                daily[day] = {"date": day, "minutes": 0, "sessions": 0}
-            daily[day]["minutes"] += session.duration_minutes or 0
-            daily[day]["sessions"] += 1
+    # Fill in zero-days so charts are continuous
+    result = []
+    today = now.date()
+    for i in range(days):
+        d = (today - timedelta(days=days - 1 - i)).isoformat()
+        result.append(daily.get(d, {"date": d, "minutes": 0, "sessions": 0}))
 
-        # Fill in zero-days so charts are continuous
-        result = []
-        for i in range(days):
-            d = (now - timedelta(days=days - 1 - i)).strftime("%Y-%m-%d")
-            result.append(daily.get(d, {"date": d, "minutes": 0, "sessions": 0}))
-
-        return jsonify(result)
+    return jsonify(result)
 
 
 @bp.route("/streaks", methods=["GET"])
 def streaks():
     """Current streak, longest streak, and total study days."""
     user_id = get_current_user_id()
+    # One row per study day rather than per session; the distinct dates
+    # come off the idx_ss_user_started index.
+    study_day = func.date(StudySession.started_at, type_=Date)
     with get_db() as db:
-        sessions = (
-            db.query(StudySession)
+        rows = (
+            db.query(study_day)
             .filter(StudySession.user_id == user_id)
-            .order_by(StudySession.started_at.desc())
+            .distinct()
+            .order_by(study_day.desc())
             .all()
         )
 
-    if not sessions:
+    if not rows:
         return jsonify({"current_streak": 0, "longest_streak": 0, "total_days": 0})
 
-    # Collect unique study dates (UTC date strings)
-    study_dates = sorted(
-        {s.started_at.strftime("%Y-%m-%d") for s in sessions},
-        reverse=True,
-    )
-
-    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    yesterday = (datetime.now(timezone.utc) - timedelta(days=1)).strftime("%Y-%m-%d")
+    # Study days as date ordinals, newest first; consecutive days differ
+    # by exactly 1, so no date parsing or timedelta math is needed.
+    days = [day.toordinal() for (day,) in rows]
 
     # Current streak — count from today or yesterday backwards
+    today = datetime.now(timezone.utc).date().toordinal()
     current_streak = 0
-    if study_dates and study_dates[0] in (today, yesterday):
-        check = datetime.now(timezone.utc).date() if study_dates[0] == today else (datetime.now(timezone.utc) - timedelta(days=1)).date()
-        for date_str in study_dates:
-            d = datetime.strptime(date_str, "%Y-%m-%d").date()
-            if d == check:
-                current_streak += 1
-                check -= timedelta(days=1)
-            elif d < check:
+    if days[0] in (today, today - 1):
+        start = days[0]
+        for i, day in enumerate(days):
+            if day != start - i:
                 break
+            current_streak += 1
 
     # Longest streak
-    longest = 0
-    run = 1
-    dates_asc = sorted(study_dates)
-    for i in range(1, len(dates_asc)):
-        prev = datetime.strptime(dates_asc[i - 1], "%Y-%m-%d").date()
-        curr = datetime.strptime(dates_asc[i], "%Y-%m-%d").date()
-        if (curr - prev).days == 1:
-            run += 1
-            longest = max(longest, run)
-        else:
-            run = 1
-    longest = max(longest, run)
+    longest = run = 1
+    for prev, curr in zip(days, days[1:]):
+        run = run + 1 if prev - curr == 1 else 1
+        if run > longest:
+            longest = run
 
     return jsonify({
         "current_streak": current_streak,
         "longest_streak": longest,
-        "total_days": len(study_dates),
+        "total_days": len(days),
     })
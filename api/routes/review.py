@@ -14,7 +14,7 @@ from api.services.spaced_repetition import (
     generate_cards_for_subject,
     generate_cards_for_chunk,
 )
-from api.services.tier_limits import check_tier_limit
+from api.services.tier_limits import check_tier_limit, invalidate_tier_status
 
 bp = Blueprint("review", __name__, url_prefix="/api/review")
 
@@ -96,10 +96,11 @@ def generate_subject_cards(subject: str):
 
     try:
         with get_db() as db:
-            check_tier_limit(db, get_current_user(), "flashcard_generations_daily")
+            check_tier_limit(db, get_current_user(db=db), "flashcard_generations_daily")
         cards = generate_cards_for_subject(subject, max_chunks=max_chunks, user_id=user_id)
     except RuntimeError as e:
         raise ValidationError(str(e))
+    invalidate_tier_status(user_id)
 
     return jsonify({
         "generated": len(cards),
@@ -113,10 +114,11 @@ def generate_chunk_cards(chunk_id: str):
     user_id = get_current_user_id()
     try:
         with get_db() as db:
-            check_tier_limit(db, get_current_user(), "flashcard_generations_daily")
+            check_tier_limit(db, get_current_user(db=db), "flashcard_generations_daily")
         cards = generate_cards_for_chunk(chunk_id, user_id=user_id)
     except (ValueError, RuntimeError) as e:
         raise ValidationError(str(e))
+    invalidate_tier_status(user_id)
 
     return jsonify({
         "generated": len(cards),
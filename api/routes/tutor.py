@@ -1,44 +1,37 @@
 """AI tutor session routes with SSE streaming."""
 
-import json
-import os
 import re
 import time
 
+import orjson
 from flask import Blueprint, request, jsonify, Response
 
 from api.errors import ValidationError, NotFoundError
 from api.middleware.auth import get_current_user, get_current_user_id, login_required
-from api.services import tutor_engine
+from api.services import debug_log, tutor_engine
 from api.services.database import get_db
 from api.services.prompt_library import MODES
-from api.services.tier_limits import check_tier_limit
+from api.services.tier_limits import check_tier_limit, invalidate_tier_status
 
 _PERF_TAG_RE = re.compile(r"<performance>[\s\S]*?</performance>")
-_DEBUG_LOG_PATH = r"c:\Dev\LawFlow\.claude\worktrees\charming-dewdney\.cursor\debug.log"
 
 
 def _debug_log(hypothesis_id: str, message: str, data: dict):
     # #region agent log
-    try:
-        os.makedirs(os.path.dirname(_DEBUG_LOG_PATH), exist_ok=True)
-        with open(_DEBUG_LOG_PATH, "a", encoding="utf-8") as f:
-            f.write(
-                json.dumps(
-                    {
-                        "id": f"log_{int(time.time() * 1000)}_tutor_route",
-                        "timestamp": int(time.time() * 1000),
-                        "runId": "pre-fix",
-                        "hypothesisId": hypothesis_id,
-                        "location": "api/routes/tutor.py:get_session",
-                        "message": message,
-                        "data": data,
-                    }
-                )
-                + "\n"
-            )
-    except Exception:
-        pass
+    if not debug_log.ENABLED:
+        return
+    now_ms = int(time.time() * 1000)
+    debug_log.emit(
+        {
+            "id": f"log_{now_ms}_tutor_route",
+            "timestamp": now_ms,
+            "runId": "pre-fix",
+            "hypothesisId": hypothesis_id,
+            "location": "api/routes/tutor.py:get_session",
+            "message": message,
+            "data": data,
+        }
+    )
     # #endregion
 
 bp = Blueprint("tutor", __name__, url_prefix="/api/tutor")
@@ -77,7 +70,7 @@ def create_session():
         raise ValidationError(f"Invalid mode. Available: {', '.join(MODES.keys())}")
 
     with get_db() as db:
-        check_tier_limit(db, get_current_user(), "tutor_sessions_daily")
+        check_tier_limit(db, get_current_user(db=db), "tutor_sessions_daily")
 
     session = tutor_engine.create_session(
         mode=mode,
@@ -85,6 +78,7 @@ def create_session():
         topics=data.get("topics"),
         user_id=user_id,
     )
+    invalidate_tier_status(user_id)
     return jsonify(session), 201
 
 
@@ -163,10 +157,10 @@ def send_message():
 
                 text = _PERF_TAG_RE.sub("", text)
                 if text:
-                    yield f"data: {json.dumps(text)}\n\n"
-            yield "data: [DONE]\n\n"
+                    yield b"data: " + orjson.dumps(text) + b"\n\n"
+            yield b"data: [DONE]\n\n"
         except ValueError as e:
-            yield f"data: [ERROR] {str(e)}\n\n"
+            yield f"data: [ERROR] {e}\n\n".encode()
 
     return Response(generate(), mimetype="text/event-stream")
 
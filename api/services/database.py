@@ -2,25 +2,38 @@
 
 import logging
 import os
+import sqlite3
 from contextlib import contextmanager
 from typing import Iterator
 
-from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy import Boolean, Date, LargeBinary, create_engine, event, inspect, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, Session
 
 from api.config import config
-import api.models  # noqa: F401 - ensure all model metadata is registered
+from api.models import import_all_models
 from api.models.base import Base
+from api.models.user import POSTGRES_ONLY_INDEXES, TRIGRAM_INDEXES
 
 logger = logging.getLogger(__name__)
 
 # Ensure data directory exists
 os.makedirs("data", exist_ok=True)
 
+# Batch multi-row INSERTs so bulk paths (seeding, ledger, messages) don't
+# emit one statement per row. SQLite uses native insertmanyvalues; psycopg2
+# additionally batches executemany() for UPDATE/DELETE.
+_engine_kwargs: dict = {"insertmanyvalues_page_size": 1000}
+_db_url = make_url(config.DATABASE_URL)
+if _db_url.get_backend_name() == "postgresql" and _db_url.get_driver_name() == "psycopg2":
+    _engine_kwargs["executemany_mode"] = "values_plus_batch"
+
 engine = create_engine(
     config.DATABASE_URL,
     echo=config.DEBUG,
     pool_pre_ping=True,
+    **_engine_kwargs,
 )
 
 # Enable WAL mode and foreign keys for SQLite
@@ -51,13 +64,13 @@ def get_db() -> Iterator[Session]:
 
 
 def _migrate_missing_columns():
-    """Add any columns defined in models but missing from the SQLite database.
+    """Add any columns defined in models but missing from the database.
 
     SQLAlchemy's create_all only creates missing *tables*, not missing columns
-    on existing tables. This lightweight migration covers schema drift for
-    SQLite (which supports ADD COLUMN but not DROP/ALTER).
+    on existing tables. This lightweight migration covers schema drift with
+    ADD COLUMN, which both SQLite and Postgres support.
     """
-    if "sqlite" not in config.DATABASE_URL:
+    if _db_url.get_backend_name() not in ("postgresql", "sqlite"):
         return
 
     insp = inspect(engine)
@@ -67,14 +80,14 @@ def _migrate_missing_columns():
                 continue
             existing = {c["name"] for c in insp.get_columns(table_name)}
             for col in table.columns:
-                if col.name not in existing:
+                if col.name not in existing and col.computed is None:
                     col_type = col.type.compile(engine.dialect)
                     stmt = f"ALTER TABLE {table_name} ADD COLUMN {col.name} {col_type}"
                     logger.info("Migrating: %s", stmt)
                     conn.execute(text(stmt))
 
         # Backfill newly-added user security fields for existing accounts.
-        if insp.has_table("users"):
+        if "sqlite" in config.DATABASE_URL and insp.has_table("users"):
             conn.execute(
                 text(
                     "UPDATE users SET email_verified = 1 "
@@ -95,53 +108,346 @@ def _migrate_missing_columns():
             )
 
 
-_init_done = False
+def _migrate_sm2_ease_factor():
+    """Move spaced_repetition_cards.ease_factor (float) to ease_factor_x100.
 
+    On SQLite the new column was already added by _migrate_missing_columns.
+    The float column is dropped once copied where the backend supports it.
+    """
+    insp = inspect(engine)
+    if not insp.has_table("spaced_repetition_cards"):
+        return
+    existing = {c["name"] for c in insp.get_columns("spaced_repetition_cards")}
+    if "ease_factor" not in existing:
+        return
 
-def init_database():
-    """Create all tables and migrate any missing columns.
+    backend = _db_url.get_backend_name()
+    with engine.begin() as conn:
+        if "ease_factor_x100" not in existing:
+            conn.execute(text(
+                "ALTER TABLE spaced_repetition_cards ADD COLUMN ease_factor_x100 SMALLINT"
+            ))
+        conn.execute(text(
+            "UPDATE spaced_repetition_cards "
+            "SET ease_factor_x100 = CAST(ROUND(COALESCE(ease_factor, 2.5) * 100) AS INTEGER) "
+            "WHERE ease_factor_x100 IS NULL"
+        ))
+        if backend == "postgresql":
+            conn.execute(text(
+                "ALTER TABLE spaced_repetition_cards "
+                "ALTER COLUMN ease_factor_x100 SET DEFAULT 250, "
+                "ALTER COLUMN ease_factor_x100 SET NOT NULL, "
+                "DROP COLUMN ease_factor"
+            ))
+        elif backend == "sqlite" and sqlite3.sqlite_version_info >= (3, 35, 0):
+            conn.execute(text("ALTER TABLE spaced_repetition_cards DROP COLUMN ease_factor"))
+    logger.info("Migrated spaced_repetition_cards.ease_factor to ease_factor_x100")
 
-    Safe to call from multiple gunicorn workers -- uses a module-level
-    flag to skip redundant work and wraps DDL in a try/except so that
-    'already exists' errors from a concurrent worker don't crash the
-    process.
+
+def _migrate_computed_columns():
+    """Add generated columns missing from existing tables.
+
+    Postgres can add STORED generated columns in place. SQLite only allows
+    VIRTUAL ones via ALTER TABLE; those are computed on read, which is
+    still correct, and new databases get STORED columns from create_all().
     """
-    global _init_done
-    if _init_done:
+    backend = _db_url.get_backend_name()
+    if backend not in ("postgresql", "sqlite"):
+        return
+    storage = "STORED" if backend == "postgresql" else "VIRTUAL"
+
+    insp = inspect(engine)
+    with engine.begin() as conn:
+        for table_name, table in Base.metadata.tables.items():
+            if not insp.has_table(table_name):
+                continue
+            existing = {c["name"] for c in insp.get_columns(table_name)}
+            for col in table.columns:
+                if col.computed is None or col.name in existing:
+                    continue
+                col_type = col.type.compile(engine.dialect)
+                stmt = (
+                    f"ALTER TABLE {table_name} ADD COLUMN {col.name} {col_type} "
+                    f"GENERATED ALWAYS AS ({col.computed.sqltext}) {storage}"
+                )
+                logger.info("Migrating: %s", stmt)
+                conn.execute(text(stmt))
+
+
+# Postgres columns whose declared type changed after tables were created:
+# (table, column, reflected type that means "already migrated", DDL type,
+# USING expression). SQLite stores the old values in a form the new types
+# read back as-is, so it needs no conversion.
+_POSTGRES_TYPE_CASTS: tuple[tuple[str, str, type, str, str], ...] = (
+    ("rewards_profile", "last_active_date", Date, "DATE",
+     "NULLIF(last_active_date, '')::date"),
+    ("assessments", "is_timed", Boolean, "BOOLEAN", "is_timed <> 0"),
+    ("assessment_questions", "is_correct", Boolean, "BOOLEAN", "is_correct <> 0"),
+    ("study_plans", "is_active", Boolean, "BOOLEAN", "is_active <> 0"),
+    ("plan_tasks", "is_completed", Boolean, "BOOLEAN", "is_completed <> 0"),
+)
+
+
+def _migrate_postgres_column_types():
+    """Convert legacy column types on Postgres.
+
+    JSON document columns used to hold json.dumps() output in TEXT and are
+    cast to JSONB; the explicit casts above cover the rest.
+    """
+    if _db_url.get_backend_name() != "postgresql":
+        return
+
+    insp = inspect(engine)
+    with engine.begin() as conn:
+        casts = []
+        for table_name, table in Base.metadata.tables.items():
+            if not insp.has_table(table_name):
+                continue
+            existing = {c["name"]: c["type"] for c in insp.get_columns(table_name)}
+            for col in table.columns:
+                if not isinstance(col.type.dialect_impl(engine.dialect), JSONB):
+                    continue
+                if col.name in existing and not isinstance(existing[col.name], JSONB):
+                    casts.append((table_name, col.name, "JSONB", f"NULLIF({col.name}, '')::jsonb"))
+            for cast_table, col_name, done_type, ddl_type, using in _POSTGRES_TYPE_CASTS:
+                if cast_table == table_name and col_name in existing \
+                        and not isinstance(existing[col_name], done_type):
+                    casts.append((table_name, col_name, ddl_type, using))
+
+        for table_name, col_name, ddl_type, using in casts:
+            stmt = (
+                f"ALTER TABLE {table_name} ALTER COLUMN {col_name} "
+                f"TYPE {ddl_type} USING {using}"
+            )
+            logger.info("Migrating: %s", stmt)
+            conn.execute(text(stmt))
+
+
+def _migrate_postgres_server_defaults():
+    """Attach server-side column defaults to tables created before them.
+
+    create_all() only emits DEFAULT clauses for new tables. Postgres can add
+    them in place; SQLite cannot, and its rows keep getting timestamps from
+    the ORM-side default.
+    """
+    if _db_url.get_backend_name() != "postgresql":
+        return
+
+    insp = inspect(engine)
+    with engine.begin() as conn:
+        for table_name, table in Base.metadata.tables.items():
+            if not insp.has_table(table_name):
+                continue
+            existing = {c["name"]: c.get("default") for c in insp.get_columns(table_name)}
+            for col in table.columns:
+                if col.server_default is None or col.name not in existing:
+                    continue
+                if existing[col.name] is not None:
+                    continue
+                default_sql = col.server_default.arg.compile(dialect=engine.dialect)
+                stmt = (
+                    f"ALTER TABLE {table_name} ALTER COLUMN {col.name} "
+                    f"SET DEFAULT {default_sql}"
+                )
+                logger.info("Migrating: %s", stmt)
+                conn.execute(text(stmt))
+
+
+def _migrate_auth_token_hashes():
+    """Convert hex-encoded auth_tokens.token_hash values to raw digests."""
+    insp = inspect(engine)
+    if not insp.has_table("auth_tokens"):
+        return
+
+    with engine.begin() as conn:
+        if _db_url.get_backend_name() == "postgresql":
+            col_type = next(
+                c["type"] for c in insp.get_columns("auth_tokens") if c["name"] == "token_hash"
+            )
+            if not isinstance(col_type, LargeBinary):
+                conn.execute(text(
+                    "ALTER TABLE auth_tokens ALTER COLUMN token_hash "
+                    "TYPE BYTEA USING decode(token_hash, 'hex')"
+                ))
+            return
+        if _db_url.get_backend_name() != "sqlite":
+            return
+
+        # SQLite keeps whatever was stored; rewrite legacy text rows in place.
+        rows = conn.execute(text(
+            "SELECT id, token_hash FROM auth_tokens WHERE typeof(token_hash) = 'text'"
+        )).fetchall()
+        for token_id, hex_hash in rows:
+            conn.execute(
+                text("UPDATE auth_tokens SET token_hash = :h WHERE id = :id"),
+                {"h": bytes.fromhex(hex_hash), "id": token_id},
+            )
+
+
+def _reconcile_reward_totals():
+    """Resync rewards_profile.total_earned with the ledger, once.
+
+    Balances used to be computed as SUM(point_ledger.amount) on every read;
+    total_earned is now the source of truth. Databases that still carry the
+    old idx_pl_user index predate that switch, so recompute their totals
+    before the index is dropped.
+    """
+    insp = inspect(engine)
+    if not insp.has_table("point_ledger") or not insp.has_table("rewards_profile"):
         return
+    if "idx_pl_user" not in {ix["name"] for ix in insp.get_indexes("point_ledger")}:
+        return
+
+    with engine.begin() as conn:
+        conn.execute(text(
+            "UPDATE rewards_profile SET total_earned = ("
+            "SELECT COALESCE(SUM(amount), 0) FROM point_ledger "
+            "WHERE point_ledger.user_id = rewards_profile.user_id) "
+            "WHERE user_id IS NOT NULL"
+        ))
+
+
+# Indexes removed from the models because a composite index or unique
+# constraint with the same leading columns already serves their queries.
+_OBSOLETE_INDEXES: tuple[str, ...] = (
+    "idx_kc_user",
+    "idx_kc_subject",
+    "idx_sm_user",
+    "idx_tm_user",
+    "idx_tm_subject",
+    "idx_src_review",
+    "ix_auth_tokens_token_hash",
+    "ix_auth_tokens_purpose",
+    "ix_auth_tokens_user_id",
+    "idx_pl_user",
+    "idx_pl_created",
+    "idx_ss_user",
+    "idx_asmt_user",
+    "idx_etw_user",
+    "idx_aq_user",
+    "idx_tok_hash_purpose",
+)
+
+
+def _create_missing_indexes():
+    """Create model indexes missing from tables that already existed.
+
+    create_all() only builds indexes together with a new table, so indexes
+    added to a model later are created here. Each is a plain CREATE INDEX
+    that holds off writes to its table while it builds.
+    """
+    on_postgres = engine.dialect.name == "postgresql"
+    insp = inspect(engine)
+    with engine.begin() as conn:
+        for table_name, table in Base.metadata.tables.items():
+            if not insp.has_table(table_name):
+                continue
+            existing = {ix["name"] for ix in insp.get_indexes(table_name)}
+            for index in table.indexes:
+                if index.name in existing:
+                    continue
+                if index.name in POSTGRES_ONLY_INDEXES and not on_postgres:
+                    continue
+                if index.name in TRIGRAM_INDEXES and not _pg_trgm_available:
+                    continue
+                logger.info("Migrating: create index %s", index.name)
+                index.create(conn, checkfirst=True)
+
+
+def _drop_obsolete_indexes():
+    """Drop indexes that create_all() will no longer create but won't remove."""
+    with engine.begin() as conn:
+        for name in _OBSOLETE_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+_init_done = False
+_pg_trgm_available = False
 
+
+def _ensure_pg_trgm():
+    """Install pg_trgm, which the users search indexes need, on Postgres.
+
+    A role that may not create extensions gets a warning and no trigram
+    indexes; admin search still works, just without index support.
+    """
+    global _pg_trgm_available
+    if _db_url.get_backend_name() != "postgresql":
+        return
     try:
-        Base.metadata.create_all(bind=engine, checkfirst=True)
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
     except Exception as exc:
         msg = str(exc)
-        if "already exists" in msg:
-            logger.warning(
-                "create_all: 'already exists' (safe): %s", exc,
-            )
-        elif "database is locked" in msg:
-            logger.warning(
-                "create_all: DB locked (another worker): %s", exc,
-            )
-        else:
+        if "permission denied" in msg:
+            logger.warning("pg_trgm unavailable, skipping trigram indexes: %s", exc)
+        elif "already exists" not in msg and "duplicate key" not in msg:
+            # A concurrent worker's CREATE EXTENSION can lose the race on
+            # pg_extension_name_index; anything else is a real failure.
             raise
+    with engine.connect() as conn:
+        _pg_trgm_available = conn.execute(
+            text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        ).first() is not None
+
+
+def _create_all():
+    Base.metadata.create_all(bind=engine, checkfirst=True)
+
 
+def _run_init_step(step) -> None:
+    """Run one init step, tolerating a race with a concurrently booting worker.
+
+    Each step is guarded on its own, so a benign "already exists" or
+    "database is locked" in one step doesn't skip the ones after it.
+    """
     try:
-        _migrate_missing_columns()
+        step()
     except Exception as exc:
         msg = str(exc)
-        if "already exists" in msg or "database is locked" in msg:
-            logger.warning(
-                "Migration concurrency issue (safe): %s", exc,
-            )
+        if "already exists" in msg:
+            logger.warning("%s: 'already exists' (safe): %s", step.__name__, exc)
+        elif "database is locked" in msg:
+            logger.warning("%s: DB locked (another worker): %s", step.__name__, exc)
         else:
             raise
 
+
+def init_database():
+    """Create all tables and migrate any missing columns.
+
+    Safe to call from multiple gunicorn workers -- uses a module-level
+    flag to skip redundant work and wraps DDL in a try/except so that
+    'already exists' errors from a concurrent worker don't crash the
+    process.
+    """
+    global _init_done
+    if _init_done:
+        return
+
+    import_all_models()
+    for step in (
+        _ensure_pg_trgm,
+        _create_all,
+        _migrate_missing_columns,
+        _migrate_computed_columns,
+        _migrate_sm2_ease_factor,
+        _migrate_postgres_column_types,
+        _migrate_postgres_server_defaults,
+        _migrate_auth_token_hashes,
+        _reconcile_reward_totals,
+        _create_missing_indexes,
+        _drop_obsolete_indexes,
+    ):
+        _run_init_step(step)
+
     _init_done = True
     logger.info("Database initialized successfully.")
 
 
 def reset_database():
     """Drop and recreate all tables. WARNING: destroys all data."""
+    import_all_models()
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
     print("Database reset successfully.")
@@ -0,0 +1,70 @@
+"""Opt-in JSON-lines debug trace for the tutor and auto-teach routes.
+
+Off unless LAWFLOW_DEBUG_LOG=1, in which case records are queued and a
+single daemon thread appends them to LAWFLOW_DEBUG_LOG_PATH in batches, so
+request threads never touch the disk. Records are dropped if the queue is
+full; this is a diagnostic aid, not an audit log.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+
+ENABLED = os.getenv("LAWFLOW_DEBUG_LOG") == "1"
+
+_PATH = os.getenv(
+    "LAWFLOW_DEBUG_LOG_PATH",
+    r"c:\Dev\LawFlow\.claude\worktrees\charming-dewdney\.cursor\debug.log",
+)
+_QUEUE_MAXSIZE = 1024
+_BATCH_SIZE = 64
+_FLUSH_INTERVAL_SECONDS = 0.1
+
+_queue: "queue.Queue[dict]" = queue.Queue(maxsize=_QUEUE_MAXSIZE)
+_writer: threading.Thread | None = None
+_writer_lock = threading.Lock()
+
+
+def _write_forever() -> None:
+    try:
+        os.makedirs(os.path.dirname(_PATH) or ".", exist_ok=True)
+        f = open(_PATH, "a", encoding="utf-8")
+    except OSError:
+        return
+    with f:
+        while True:
+            batch = [_queue.get()]
+            deadline = time.monotonic() + _FLUSH_INTERVAL_SECONDS
+            while len(batch) < _BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(_queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            try:
+                f.write("".join(json.dumps(r, default=str) + "\n" for r in batch))
+                f.flush()
+            except OSError:
+                pass
+
+
+def emit(record: dict) -> None:
+    """Queue one record for the writer thread; a no-op unless enabled."""
+    if not ENABLED:
+        return
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = threading.Thread(
+                    target=_write_forever, name="debug-log-writer", daemon=True
+                )
+                _writer.start()
+    try:
+        _queue.put_nowait(record)
+    except queue.Full:
+        pass
@@ -0,0 +1,264 @@
+"""Bounded background pool for document processing.
+
+Uploads are queued here instead of each spawning its own thread, so at
+most DOCUMENT_WORKERS documents are extracted and tagged at once and a
+burst of uploads can't turn into a burst of concurrent Claude calls.
+
+The documents table is the durable queue. A worker claims a row by
+stamping it with its process id (claimed_by) and keeps claimed_at fresh
+while the job runs. Rows left "pending", or "processing" under a claim
+that stopped being refreshed because its process died, for longer than
+_CLAIM_TIMEOUT are queued again when a process starts. Results are only saved under a claim the saving
+process still holds, so a job that was taken over never writes twice.
+"""
+
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+from datetime import timedelta
+from typing import Callable
+
+from sqlalchemy import and_, or_
+
+from api.config import config
+from api.models.base import _now
+from api.models.document import Document, KnowledgeChunk
+from api.services import rewards_engine
+from api.services.database import get_db
+from api.services.document_processor import chunk_sections, extract_document
+from api.services.knowledge_builder import insert_tagged_chunks, tag_chunks_batch
+
+logger = logging.getLogger(__name__)
+
+_HEARTBEAT_SECONDS = 60
+# A claim not refreshed for this long belongs to a process that is gone.
+_CLAIM_TIMEOUT = timedelta(minutes=5)
+
+_queue: "queue.Queue[tuple[Callable, tuple]]" = queue.Queue()
+_started = False
+_start_lock = threading.Lock()
+_owner = f"{socket.gethostname()}:{os.getpid()}"
+_in_flight: set[str] = set()
+_in_flight_lock = threading.Lock()
+
+
+def _after_fork_in_child() -> None:
+    # Threads don't survive fork (gunicorn --preload), and the parent's
+    # queue and locks may be mid-use; each worker process starts clean.
+    global _queue, _started, _start_lock, _owner, _in_flight, _in_flight_lock
+    _queue = queue.Queue()
+    _started = False
+    _start_lock = threading.Lock()
+    _owner = f"{socket.gethostname()}:{os.getpid()}"
+    _in_flight = set()
+    _in_flight_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):  # not on Windows
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def _work_forever(jobs: "queue.Queue[tuple[Callable, tuple]]") -> None:
+    while True:
+        fn, args = jobs.get()
+        try:
+            fn(*args)
+        except Exception:
+            logger.exception("Document job %s%r failed", fn.__name__, args)
+
+
+def _heartbeat_forever() -> None:
+    while True:
+        time.sleep(_HEARTBEAT_SECONDS)
+        with _in_flight_lock:
+            doc_ids = list(_in_flight)
+        if not doc_ids:
+            continue
+        try:
+            with get_db() as db:
+                db.query(Document).filter(
+                    Document.id.in_(doc_ids), Document.claimed_by == _owner
+                ).update({"claimed_at": _now()}, synchronize_session=False)
+        except Exception:
+            logger.exception("Document claim heartbeat failed")
+
+
+def start() -> None:
+    """Start this process's workers once, queueing resume_pending() first."""
+    global _started
+    if _started:
+        return
+    with _start_lock:
+        if _started:
+            return
+        _queue.put((resume_pending, ()))
+        for i in range(config.DOCUMENT_WORKERS):
+            threading.Thread(
+                target=_work_forever,
+                args=(_queue,),
+                name=f"document-worker-{i}",
+                daemon=True,
+            ).start()
+        threading.Thread(
+            target=_heartbeat_forever, name="document-heartbeat", daemon=True
+        ).start()
+        _started = True
+
+
+def submit(fn: Callable, *args) -> None:
+    """Queue ``fn(*args)`` for a worker thread."""
+    start()
+    _queue.put((fn, args))
+
+
+def _claimable(now):
+    # Fresh "pending" rows are claimable here: claim() runs in the process
+    # that accepted the upload, straight from its own queue.
+    return or_(
+        Document.processing_status == "pending",
+        and_(
+            Document.processing_status == "processing",
+            or_(Document.claimed_at.is_(None), Document.claimed_at < now - _CLAIM_TIMEOUT),
+        ),
+    )
+
+
+def claim(db, doc_id: str, user_id: str) -> bool:
+    """Claim a pending or abandoned document for this process.
+
+    False when it is gone or a live process already holds it, so a job
+    queued twice (by two processes resuming at once) only runs once.
+    """
+    now = _now()
+    claimed = (
+        db.query(Document)
+        .filter(Document.id == doc_id, Document.user_id == user_id, _claimable(now))
+        .update(
+            {"processing_status": "processing", "claimed_by": _owner, "claimed_at": now},
+            synchronize_session=False,
+        )
+    )
+    if claimed != 1:
+        return False
+    with _in_flight_lock:
+        _in_flight.add(doc_id)
+    return True
+
+
+def _update_if_owned(db, doc_id: str, values: dict) -> bool:
+    updated = (
+        db.query(Document)
+        .filter(
+            Document.id == doc_id,
+            Document.processing_status == "processing",
+            Document.claimed_by == _owner,
+        )
+        .update(values, synchronize_session=False)
+    )
+    return updated == 1
+
+
+def _extract_and_save(doc_id: str, user_id: str) -> bool:
+    """Extract, chunk and tag a document, then store its chunks.
+
+    Returns whether this run completed the document; False if it was
+    already claimed elsewhere, failed, or was taken over meanwhile.
+    """
+    with get_db() as db:
+        if not claim(db, doc_id, user_id):
+            return False
+        file_path, subject = (
+            db.query(Document.file_path, Document.subject).filter_by(id=doc_id).one()
+        )
+    try:
+        sections = extract_document(file_path)
+        chunks = chunk_sections(sections)
+        chunk_dicts = [{"content": c.content, "heading": c.heading} for c in chunks]
+
+        # Tag with Claude (this is the expensive step)
+        tagged = tag_chunks_batch(chunk_dicts)
+
+        with get_db() as db:
+            # The status UPDATE comes first so a takeover can't interleave;
+            # old chunks are replaced in case an earlier run got this far.
+            if not _update_if_owned(
+                db, doc_id, {"processing_status": "completed", "total_chunks": len(tagged)}
+            ):
+                return False
+            db.query(KnowledgeChunk).filter_by(document_id=doc_id).delete(
+                synchronize_session=False
+            )
+            insert_tagged_chunks(db, user_id, doc_id, tagged, subject or "other")
+        return True
+    except Exception as e:
+        with get_db() as db:
+            _update_if_owned(
+                db, doc_id, {"processing_status": "error", "error_message": str(e)}
+            )
+        return False
+    finally:
+        with _in_flight_lock:
+            _in_flight.discard(doc_id)
+
+
+def process_document(doc_id: str, user_id: str) -> None:
+    """Background processing: extract text, chunk, tag with Claude."""
+    _extract_and_save(doc_id, user_id)
+
+
+def process_past_test(doc_id: str, subject: str, user_id: str) -> None:
+    """Background: process document, analyze exam patterns, award points."""
+    if not _extract_and_save(doc_id, user_id):
+        return
+
+    # Try exam analysis for blueprint generation
+    analysis_succeeded = False
+    try:
+        from api.services.exam_analyzer import analyze_exam
+        analyze_exam(doc_id, user_id=user_id)
+        analysis_succeeded = True
+    except Exception:
+        pass  # Analysis is a bonus, not required
+
+    # Award points: 150 base + 50 if analysis succeeded
+    base = 150
+    bonus_amount = 50 if analysis_succeeded else 0
+    rewards_engine.award_points(
+        activity_type="past_test_upload",
+        activity_id=doc_id,
+        description=f"Uploaded graded past test ({subject})",
+        base_amount=base + bonus_amount,
+        metadata={"subject": subject, "analysis_succeeded": analysis_succeeded},
+        user_id=user_id,
+    )
+
+
+def _abandoned(now):
+    # Unlike _claimable, a "pending" row must also be old: a young one was
+    # just accepted by a live process that is about to run it itself.
+    cutoff = now - _CLAIM_TIMEOUT
+    return or_(
+        and_(Document.processing_status == "pending", Document.created_at < cutoff),
+        and_(
+            Document.processing_status == "processing",
+            or_(Document.claimed_at.is_(None), Document.claimed_at < cutoff),
+        ),
+    )
+
+
+def resume_pending() -> None:
+    """Queue documents a previous process accepted but never finished."""
+    with get_db() as db:
+        rows = (
+            db.query(Document.id, Document.user_id, Document.subject, Document.doc_type)
+            .filter(_abandoned(_now()))
+            .all()
+        )
+    for row in rows:
+        if row.doc_type == "past_test":
+            submit(process_past_test, row.id, row.subject, row.user_id)
+        else:
+            submit(process_document, row.id, row.user_id)
@@ -299,10 +299,10 @@ def generate_exam(
             user_id=user_id,
             assessment_type=exam_format,
             subject=subject,
-            topics=json.dumps(topics_list),
+            topics=topics_list,
             total_questions=len(questions_data),
             time_limit_minutes=time_minutes,
-            is_timed=1 if time_minutes > 0 else 0,
+            is_timed=time_minutes > 0,
         )
         db.add(assessment)
         db.flush()
@@ -314,7 +314,7 @@ def generate_exam(
                 question_index=i,
                 question_type=q_data.get("question_type", "essay"),
                 question_text=q_data["question_text"],
-                options=json.dumps(q_data.get("options")) if q_data.get("options") else None,
+                options=q_data.get("options") or None,
                 correct_answer=q_data.get("correct_answer"),
                 subject=subject,
                 topic=q_data.get("topic"),
@@ -345,7 +345,7 @@ def grade_answer(
         q_type = question.question_type
         q_text = question.question_text
         model_answer = question.correct_answer or ""
-        options = json.loads(question.options) if question.options else None
+        options = question.options or None
 
     if q_type == "mc":
         return _grade_mc(question_id, student_answer, model_answer, options, user_id=user_id)
@@ -389,7 +389,7 @@ def _grade_mc(
     with get_db() as db:
         q = db.query(AssessmentQuestion).filter_by(id=question_id, user_id=user_id).first()
         q.student_answer = answer
-        q.is_correct = 1 if is_correct else 0
+        q.is_correct = is_correct
         q.score = score
         q.feedback = feedback
         db.flush()
@@ -717,11 +717,11 @@ def get_exam_history(
 ) -> list[dict]:
     """Get past exam attempts."""
     with get_db() as db:
-        query = db.query(Assessment).filter(
+        query = db.query(*Assessment.columns_for_dict()).filter(
             Assessment.user_id == user_id,
             Assessment.completed_at.isnot(None),
         )
         if subject:
-            query = query.filter_by(subject=subject)
-        exams = query.order_by(Assessment.completed_at.desc()).limit(limit).all()
-        return [e.to_dict() for e in exams]
+            query = query.filter(Assessment.subject == subject)
+        rows = query.order_by(Assessment.completed_at.desc()).limit(limit).all()
+        return [Assessment.dict_from_row(r) for r in rows]
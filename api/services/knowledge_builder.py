@@ -4,8 +4,11 @@ import json
 import logging
 
 import anthropic
+from sqlalchemy import insert
 
 from api.config import config
+from api.models.base import _now
+from api.models.document import KnowledgeChunk
 from api.services.claude_client import get_claude_client
 
 logger = logging.getLogger(__name__)
@@ -85,6 +88,37 @@ def tag_chunks_batch(chunks: list[dict]) -> list[dict]:
     for chunk in chunks:
         tags = tag_chunk(chunk["content"])
         merged = {**chunk, **tags}
-        merged["key_terms"] = json.dumps(tags.get("key_terms", []))
+        merged["key_terms"] = tags.get("key_terms", [])
         results.append(merged)
     return results
+
+
+def insert_tagged_chunks(
+    db, user_id: str, doc_id: str, tagged: list[dict], default_subject: str
+) -> None:
+    """Save tag_chunks_batch() output for a document in one multi-row INSERT."""
+    if not tagged:
+        return
+    # One timestamp for the whole batch rather than a clock read per row.
+    created_at = _now()
+    db.execute(
+        insert(KnowledgeChunk),
+        [
+            {
+                "user_id": user_id,
+                "document_id": doc_id,
+                "content": t["content"],
+                "summary": t.get("summary"),
+                "chunk_index": i,
+                "subject": t.get("subject", default_subject),
+                "topic": t.get("topic"),
+                "subtopic": t.get("subtopic"),
+                "difficulty": t.get("difficulty", 50),
+                "content_type": t.get("content_type", "concept"),
+                "case_name": t.get("case_name"),
+                "key_terms": t.get("key_terms", []),
+                "created_at": created_at,
+            }
+            for i, t in enumerate(tagged)
+        ],
+    )
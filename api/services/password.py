@@ -0,0 +1,69 @@
+"""Password hashing and verification.
+
+bcrypt is the pyca package, whose Blowfish core has been Rust since 4.0;
+it is imported lazily so modules that never touch passwords don't pay
+for loading it. It releases the GIL while hashing, so under threaded
+gunicorn workers other requests keep running during a key schedule.
+"""
+
+import hmac
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from api.config import config
+
+# Successful checks are remembered briefly so repeat logins skip the key
+# schedule. Keys are HMACs under a per-process random pepper, so the cache
+# never holds anything usable outside this process. Failures are never
+# cached: every wrong guess still pays the full bcrypt cost.
+_CHECK_CACHE_TTL_SECONDS = 60
+_CHECK_CACHE_MAXSIZE = 1024
+_check_cache_pepper = secrets.token_bytes(32)
+_check_cache: "OrderedDict[bytes, float]" = OrderedDict()
+_check_cache_lock = threading.Lock()
+
+
+def hash_password(password: str, rounds: int | None = None) -> str:
+    """Hash with a fresh salt at ``rounds`` (defaults to BCRYPT_ROUNDS)."""
+    import bcrypt
+
+    salt = bcrypt.gensalt(rounds or config.BCRYPT_ROUNDS)
+    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+
+
+def check_password(password: str, password_hash: str) -> bool:
+    """Return whether ``password`` matches ``password_hash``.
+
+    Malformed hashes count as a mismatch rather than raising.
+    """
+    import bcrypt
+
+    # The stored hash is part of the key, so a password change can never
+    # match an entry made for the old one.
+    key = hmac.digest(
+        _check_cache_pepper,
+        password.encode("utf-8") + b"\0" + password_hash.encode("utf-8"),
+        "sha256",
+    )
+    now = time.monotonic()
+    with _check_cache_lock:
+        expires_at = _check_cache.get(key)
+        if expires_at is not None:
+            if expires_at > now:
+                _check_cache.move_to_end(key)
+                return True
+            del _check_cache[key]
+
+    try:
+        ok = bcrypt.checkpw(password.encode("utf-8"), password_hash.encode("utf-8"))
+    except ValueError:
+        return False
+    if ok:
+        with _check_cache_lock:
+            _check_cache[key] = time.monotonic() + _CHECK_CACHE_TTL_SECONDS
+            _check_cache.move_to_end(key)
+            while len(_check_cache) > _CHECK_CACHE_MAXSIZE:
+                _check_cache.popitem(last=False)
+    return ok
@@ -5,12 +5,9 @@ This function handles: ledger entries, random bonuses, streak tracking,
 achievement progress, and level calculation.
 """
 
-import json
 import logging
 import random
-from datetime import datetime, timezone
-
-from sqlalchemy import func
+from datetime import datetime, timedelta, timezone
 
 from api.models.rewards import PointLedger, Achievement, RewardsProfile
 from api.models.student import TopicMastery
@@ -69,7 +66,7 @@ def award_points(
                 activity_type=activity_type,
                 activity_id=activity_id,
                 description=description,
-                metadata_json=json.dumps(metadata) if metadata else None,
+                metadata_json=metadata or None,
             ))
 
             # 2. Roll for random bonus (15% chance)
@@ -92,6 +89,8 @@ def award_points(
             result["streak_info"] = streak_info
             if streak_info and streak_info.get("bonus", 0) > 0:
                 result["points_awarded"] += streak_info["bonus"]
+            for ach in (streak_info or {}).get("achievements", []):
+                result["points_awarded"] += ach["points_awarded"]
 
             # 4. Check achievement progress
             unlocked = _check_achievements(db, activity_type, metadata or {}, user_id=user_id)
@@ -113,8 +112,16 @@ def award_points(
                     result["achievements_unlocked"].append(ach)
                     result["points_awarded"] += ach["points_awarded"]
 
-            # 5. Update profile totals and level
-            profile.total_earned += result["points_awarded"]
+            # 5. Update profile totals and level. Every ledger row written
+            # above is counted in points_awarded, so total_earned stays equal
+            # to SUM(amount) without re-aggregating the ledger. The increment
+            # runs in SQL so concurrent awards for one user can't lose points;
+            # its row lock also orders the level update below.
+            db.query(RewardsProfile).filter_by(id=profile.id).update(
+                {"total_earned": RewardsProfile.total_earned + result["points_awarded"]},
+                synchronize_session=False,
+            )
+            db.refresh(profile, ["total_earned", "level"])
             old_level = profile.level
             new_level, new_title = _calculate_level(profile.total_earned)
             profile.level = new_level
@@ -127,10 +134,7 @@ def award_points(
                     "new_title": new_title,
                 }
 
-            db.flush()
-
-            # 6. Compute balance
-            result["new_balance"] = _get_balance(db, user_id=user_id)
+            result["new_balance"] = profile.total_earned
 
     except Exception:
         logger.exception("Error awarding points for %s", activity_type)
@@ -139,16 +143,21 @@ def award_points(
 
 
 def get_balance(user_id: str | None = None) -> int:
-    """Current point balance (SUM of all ledger entries)."""
+    """Current point balance (materialized in RewardsProfile.total_earned)."""
     with get_db() as db:
-        return _get_balance(db, user_id=user_id)
+        balance = (
+            db.query(RewardsProfile.total_earned)
+            .filter_by(user_id=user_id)
+            .scalar()
+        )
+        return balance or 0
 
 
 def get_summary(user_id: str | None = None) -> dict:
     """Full rewards summary for dashboard/header."""
     with get_db() as db:
         profile = _get_or_create_profile(db, user_id=user_id)
-        balance = _get_balance(db, user_id=user_id)
+        balance = profile.total_earned or 0
 
         # Level progress toward next level
         current_threshold = 0
@@ -248,12 +257,6 @@ def _get_or_create_profile(db, user_id: str | None = None) -> RewardsProfile:
     return profile
 
 
-def _get_balance(db, user_id: str | None = None) -> int:
-    """SUM of all ledger amounts."""
-    result = db.query(func.sum(PointLedger.amount)).filter_by(user_id=user_id).scalar()
-    return result or 0
-
-
 def _roll_random_bonus() -> int | None:
     """15% chance of a random bonus between 5-50."""
     if random.random() < RANDOM_BONUS_CHANCE:
@@ -263,19 +266,13 @@ def _roll_random_bonus() -> int | None:
 
 def _update_streak(db, profile: RewardsProfile, user_id: str | None = None) -> dict | None:
     """Update daily streak. Returns streak info + any bonus awarded."""
-    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    today = datetime.now(timezone.utc).date()
 
     if profile.last_active_date == today:
         # Already active today — no streak update
         return {"current_streak": profile.current_streak, "bonus": 0, "is_new_day": False}
 
-    yesterday = None
-    if profile.last_active_date:
-        from datetime import timedelta
-        last = datetime.strptime(profile.last_active_date, "%Y-%m-%d")
-        yesterday = (datetime.now(timezone.utc) - timedelta(days=1)).strftime("%Y-%m-%d")
-
-    if profile.last_active_date == yesterday:
+    if profile.last_active_date == today - timedelta(days=1):
         # Consecutive day — extend streak
         profile.current_streak += 1
     else:
@@ -294,7 +291,7 @@ def _update_streak(db, profile: RewardsProfile, user_id: str | None = None) -> d
         activity_type="streak_bonus",
         description=f"Day {profile.current_streak} streak bonus!",
         bonus_type="streak",
-        metadata_json=json.dumps({"streak": profile.current_streak}),
+        metadata_json={"streak": profile.current_streak},
     ))
 
     # Check streak achievements
@@ -314,6 +311,17 @@ def _update_streak(db, profile: RewardsProfile, user_id: str | None = None) -> d
     }
 
 
+def _unlocked_dict(ach: Achievement) -> dict:
+    """to_dict() for an achievement just unlocked in this session.
+
+    The generated progress column is only re-read after a flush; an
+    unlocked achievement has met its target, so its progress is 1.0.
+    """
+    data = ach.to_dict()
+    data["progress"] = 1.0
+    return data
+
+
 def _check_achievements(
     db,
     activity_type: str,
@@ -346,9 +354,9 @@ def _check_achievements(
                 activity_type="achievement_unlock",
                 description=f"Achievement unlocked: {ach.title}",
                 bonus_type="first_time",
-                metadata_json=json.dumps({"achievement": key}),
+                metadata_json={"achievement": key},
             ))
-            unlocked.append(ach.to_dict())
+            unlocked.append(_unlocked_dict(ach))
 
     return unlocked
 
@@ -373,9 +381,9 @@ def _try_unlock_achievement(
             activity_type="achievement_unlock",
             description=f"Achievement unlocked: {ach.title}",
             bonus_type="first_time",
-            metadata_json=json.dumps({"achievement": key}),
+            metadata_json={"achievement": key},
         ))
-        return ach.to_dict()
+        return _unlocked_dict(ach)
     return None
 
 
@@ -32,9 +32,11 @@ def sm2_update(card: SpacedRepetitionCard, quality: int) -> SpacedRepetitionCard
     """
     quality = max(0, min(5, quality))
 
-    # Update ease factor (minimum 1.3)
-    ef = card.ease_factor + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
-    card.ease_factor = max(1.3, ef)
+    # Update ease factor (minimum 1.3), in hundredths:
+    # EF' = EF + 0.1 - (5 - q) * (0.08 + (5 - q) * 0.02)
+    miss = 5 - quality
+    ef = card.ease_factor_x100 + 10 - miss * (8 + miss * 2)
+    card.ease_factor_x100 = max(130, ef)
 
     if quality < 3:
         # Failed — reset repetitions, review again soon
@@ -46,7 +48,8 @@ def sm2_update(card: SpacedRepetitionCard, quality: int) -> SpacedRepetitionCard
         elif card.repetitions == 1:
             card.interval_days = 3
         else:
-            card.interval_days = round(card.interval_days * card.ease_factor)
+            # interval * EF, rounded half up, in integer arithmetic.
+            card.interval_days = (card.interval_days * card.ease_factor_x100 + 50) // 100
         card.repetitions += 1
 
     now = datetime.now(timezone.utc)
@@ -161,8 +161,16 @@ def seed_subject_taxonomy(user_id: str | None = None) -> None:
     Idempotent — skips rows that already exist, safe to call on every startup.
     """
     with get_db() as db:
+        # Two lookups for what exists, instead of one per subject and topic.
+        existing_subjects = {
+            subject
+            for (subject,) in db.query(SubjectMastery.subject).filter_by(user_id=user_id)
+        }
+        existing_topics = set(
+            db.query(TopicMastery.subject, TopicMastery.topic).filter_by(user_id=user_id)
+        )
         for subject_key, subject_data in TAXONOMY.items():
-            if not db.query(SubjectMastery).filter_by(user_id=user_id, subject=subject_key).first():
+            if subject_key not in existing_subjects:
                 db.add(SubjectMastery(
                     user_id=user_id,
                     subject=subject_key,
@@ -170,9 +178,7 @@ def seed_subject_taxonomy(user_id: str | None = None) -> None:
                 ))
 
             for topic_key, topic_display in subject_data["topics"].items():
-                if not db.query(TopicMastery).filter_by(
-                    user_id=user_id, subject=subject_key, topic=topic_key
-                ).first():
+                if (subject_key, topic_key) not in existing_topics:
                     db.add(TopicMastery(
                         user_id=user_id,
                         subject=subject_key,
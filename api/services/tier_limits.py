@@ -1,5 +1,8 @@
 """Subscription tier limits and usage tracking."""
 
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
 
 from api.errors import ForbiddenError
@@ -18,6 +21,45 @@ FREE_TIER_LIMITS = {
 }
 
 
+# /billing/status is polled by the dashboard. Its payload is display-only
+# (check_tier_limit always counts fresh), so it is cached briefly per user
+# and dropped once a tier change or counted action has committed.
+_TIER_STATUS_TTL_SECONDS = 30
+_TIER_STATUS_MAXSIZE = 10_000
+
+_tier_status_cache: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+_tier_status_lock = threading.Lock()
+
+
+def get_cached_tier_status(user_id: str) -> dict | None:
+    now = time.monotonic()
+    with _tier_status_lock:
+        entry = _tier_status_cache.get(user_id)
+        if entry is None:
+            return None
+        expires_at, status = entry
+        if expires_at <= now:
+            del _tier_status_cache[user_id]
+            return None
+        _tier_status_cache.move_to_end(user_id)
+        return status
+
+
+def cache_tier_status(user_id: str, status: dict) -> None:
+    with _tier_status_lock:
+        _tier_status_cache[user_id] = (time.monotonic() + _TIER_STATUS_TTL_SECONDS, status)
+        _tier_status_cache.move_to_end(user_id)
+        while len(_tier_status_cache) > _TIER_STATUS_MAXSIZE:
+            _tier_status_cache.popitem(last=False)
+
+
+def invalidate_tier_status(user_id: str) -> None:
+    """Drop a user's cached status in this process; other workers catch up
+    within _TIER_STATUS_TTL_SECONDS."""
+    with _tier_status_lock:
+        _tier_status_cache.pop(user_id, None)
+
+
 def _day_start_utc() -> datetime:
     now = datetime.now(timezone.utc)
     return datetime(now.year, now.month, now.day, tzinfo=timezone.utc)
@@ -81,6 +123,8 @@ def _feature_display_name(feature: str) -> str:
 
 
 def check_tier_limit(db, user, feature: str, increment: int = 1) -> None:
+    # Callers invalidate_tier_status() after the counted action commits;
+    # dropping it here would let a poll re-cache the old usage meanwhile.
     tier = (user.tier or "free").lower()
     if tier == "pro":
         return
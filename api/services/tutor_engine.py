@@ -90,7 +90,7 @@ def create_session(
             session_type=session_type,
             tutor_mode=mode,
             subject=subject,
-            topics=json.dumps(topics or []),
+            topics=topics or [],
             available_minutes=available_minutes,
         )
         db.add(session)
@@ -237,7 +237,7 @@ def send_message(
     # Build system prompt
     mode = session.tutor_mode or "explain"
     subject = session.subject
-    topics = json.loads(session.topics) if session.topics else None
+    topics = session.topics or None
     avail_min = session.available_minutes
 
     student_ctx = _get_mastery_context(subject, user_id=user_id)
@@ -7,6 +7,8 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from sqlalchemy import tuple_
+
 from api.services.database import init_database, get_db
 from api.models.student import SubjectMastery, TopicMastery
 
@@ -157,36 +159,64 @@ TAXONOMY = {
     },
 }
 
+# Flat (subject_key, display_name) and (subject_key, topic_key, display_name)
+# views of TAXONOMY, built once at import.
+_SUBJECTS: tuple[tuple[str, str], ...] = tuple(
+    (subject_key, subject_data["display_name"])
+    for subject_key, subject_data in TAXONOMY.items()
+)
+_TOPICS: tuple[tuple[str, str, str], ...] = tuple(
+    (subject_key, topic_key, topic_display)
+    for subject_key, subject_data in TAXONOMY.items()
+    for topic_key, topic_display in subject_data["topics"].items()
+)
+
 
 def seed():
     """Seed all subjects and topics into the database."""
     init_database()
 
+    # Single transaction: the whole seed commits (and fsyncs) once.
     with get_db() as db:
-        for subject_key, subject_data in TAXONOMY.items():
-            # Create or update subject
-            existing = db.query(SubjectMastery).filter_by(subject=subject_key).first()
-            if not existing:
-                subj = SubjectMastery(
-                    subject=subject_key,
-                    display_name=subject_data["display_name"],
+        if db.get_bind().dialect.name == "sqlite":
+            # journal_mode=WAL is already set per connection by the engine;
+            # NORMAL is durable under WAL and skips the per-commit fsync.
+            db.connection().exec_driver_sql("PRAGMA synchronous=NORMAL")
+
+        existing_subjects = {
+            r[0]
+            for r in db.query(SubjectMastery.subject)
+            .filter(SubjectMastery.subject.in_([subject for subject, _ in _SUBJECTS]))
+            .all()
+        }
+        existing_topics = {
+            (r[0], r[1])
+            for r in db.query(TopicMastery.subject, TopicMastery.topic)
+            .filter(
+                tuple_(TopicMastery.subject, TopicMastery.topic).in_(
+                    [(subject, topic) for subject, topic, _ in _TOPICS]
                 )
-                db.add(subj)
+            )
+            .all()
+        }
+
+        subj_rows = [
+            {"subject": subject, "display_name": display}
+            for subject, display in _SUBJECTS
+            if subject not in existing_subjects
+        ]
+        topic_rows = [
+            {"subject": subject, "topic": topic, "display_name": display}
+            for subject, topic, display in _TOPICS
+            if (subject, topic) not in existing_topics
+        ]
 
-            # Create topics
-            for topic_key, topic_display in subject_data["topics"].items():
-                existing_topic = db.query(TopicMastery).filter_by(
-                    subject=subject_key, topic=topic_key
-                ).first()
-                if not existing_topic:
-                    topic = TopicMastery(
-                        subject=subject_key,
-                        topic=topic_key,
-                        display_name=topic_display,
-                    )
-                    db.add(topic)
+        if subj_rows:
+            db.bulk_insert_mappings(SubjectMastery, subj_rows)
+        if topic_rows:
+            db.bulk_insert_mappings(TopicMastery, topic_rows)
 
-    print(f"Seeded {len(TAXONOMY)} subjects with {sum(len(s['topics']) for s in TAXONOMY.values())} topics.")
+    print(f"Seeded {len(_SUBJECTS)} subjects with {len(_TOPICS)} topics.")
 
 
 if __name__ == "__main__":